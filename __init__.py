@@ -0,0 +1,97 @@
+"""
+Utilities for Sublime Text plugins
+
+Submodules are loaded on first attribute access, so that plugins only pay for importing what they
+use.
+"""
+
+import importlib
+import logging
+import time
+
+# Local logger
+_logger = logging.getLogger(__name__)
+
+# Max time in ms importing a single submodule may take, checked by tests/test_import_time.py
+IMPORT_BUDGET_MS = 10
+
+_SUBMODULES = frozenset([
+    'cache_store',
+    'edit',
+    'highlight',
+    'jobs',
+    'journal',
+    'log',
+    'menu',
+    'misc',
+    'plugin',
+    'project',
+    'region_set',
+    'scheduler',
+    'selection',
+    'settings',
+    'status',
+    'user_input',
+    'util',
+    'validators',
+    'view',
+    'view_cache',
+    'vocabulary',
+])
+
+# Time in ms it took to import each submodule loaded through attribute access
+_import_times = {}
+
+# Number of submodule imports through attribute access in progress, so that submodules imported
+# by another one are not measured as part of it
+_import_depth = 0
+
+def __getattr__(name):
+    if name not in _SUBMODULES:
+        raise AttributeError(f"module '{__name__}' has no attribute '{name}'")
+    return _import(name)
+
+def __dir__():
+    return sorted(set(globals()) | _SUBMODULES)
+
+def get_import_times():
+    """
+    Gets the time it took to import the submodules loaded through attribute access, including the
+    modules each imported in turn (like -X importtime's cumulative time). Submodules imported by
+    another one are not listed. See tests/test_import_time.py for measuring each submodule.
+
+    :returns: A dictionary of submodule name to time in ms
+    """
+
+    return dict(_import_times)
+
+def _import(name):
+    """
+    Imports a submodule, measuring the time it takes if not already imported
+
+    :param name: The submodule name
+    :returns: The module
+    """
+
+    global _import_depth
+
+    module = globals().get(name)
+    if module is not None:
+        return module
+
+    full_name = f"{__name__}.{name}"
+    _import_depth += 1
+    start = time.perf_counter()
+    try:
+        module = importlib.import_module(f".{name}", __name__)
+    finally:
+        _import_depth -= 1
+    elapsed = (time.perf_counter() - start) * 1000
+
+    # Submodules imported by another one are part of its time
+    if _import_depth == 0 and name not in _import_times:
+        _import_times[name] = elapsed
+        _logger.debug(f"Importing '{full_name}' took {elapsed:.1f} ms.")
+
+    globals()[name] = module
+    return module
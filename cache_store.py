@@ -0,0 +1,427 @@
+"""
+Module handling persistent caches of derived data (e.g. indexes) in the Sublime cache directory,
+so that they survive restarts instead of being rebuilt at startup
+"""
+
+import logging
+
+# Local logger
+_logger = logging.getLogger(__name__)
+
+import sublime
+import os
+import struct
+import threading
+import zlib
+
+from typing import Any, Hashable, List, Union
+
+# Version of the cache file format. Bump when changing it.
+FORMAT_VERSION = 1
+
+# Identifies cache files
+_MAGIC = b"SUCS"
+
+# Header of magic, format version, number of entries, offset, size and CRC-32 of the index
+_HEADER = struct.Struct("<4sHIQII")
+
+# Returned by CacheStore._read for corrupt values, as None may be a value
+_CORRUPT = object()
+
+# Stores per name, shared by all users of get_store
+_stores = {}
+_stores_lock = threading.Lock()
+
+def file_stamp(path : str) -> Union[tuple, None]:
+    """
+    Gets a validation stamp of a file, changing whenever the file is modified
+
+    :param path: The path of the file
+    :returns: A tuple of the mtime in ns and the size, or None if the file does not exist
+    """
+
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
+class CacheStore():
+    """
+    A persistent dictionary of values and their validation stamps (e.g. file_stamp of the file a
+    value was derived from), stored in a single file.
+
+    The file consists of a header, the pickled values and a pickled index of key -> (stamp,
+    offset, length, CRC-32). Loading only parses the index and maps the file into memory, so each
+    value is only read and unpickled when first requested. A file written for another version of
+    the plugin (or the file format), or failing its checksum, is discarded.
+
+    Thread-safe. Changes are only written by save.
+    """
+
+    def __init__(self, path : str, version : Hashable = None):
+        """
+        Initializes the store. The file is loaded on first access.
+
+        :param path: The path of the file
+        :param version: The version of the data, e.g. the plugin version. Bump it when changing
+                        what is stored.
+        """
+
+        self._path = path
+        self._version = version
+        self._lock = threading.Lock()
+        self._loaded = False
+        self._mmap = None
+        # Key -> (stamp, offset, length, crc) of the values in the file
+        self._index = {}
+        # Key -> (stamp, value) of the values unpickled or put
+        self._values = {}
+        # Keys of the values put since the file was written, not in the index
+        self._dirty = set()
+        self._modified = False
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._ensure_loaded()
+            return len(self._index) + len(self._dirty)
+
+    def __contains__(self, key : Hashable) -> bool:
+        with self._lock:
+            self._ensure_loaded()
+            return key in self._index or key in self._dirty
+
+    @property
+    def path(self) -> str:
+        """
+        Property reflecting the path of the file
+        """
+
+        return self._path
+
+    def keys(self) -> List[Hashable]:
+        """
+        Gets the keys of all values, regardless of their stamps
+        """
+
+        with self._lock:
+            self._ensure_loaded()
+            return list(self._index) + list(self._dirty)
+
+    def get(self, key : Hashable, stamp : Hashable = None, default : Any = None) -> Any:
+        """
+        Gets a value, unless its stamp differs, in which case it is discarded as outdated
+
+        :param key: The key
+        :param stamp: The current validation stamp
+        :param default: The value to return if missing or outdated
+        """
+
+        with self._lock:
+            self._ensure_loaded()
+
+            cached = self._values.get(key)
+            if cached is not None:
+                if cached[0] == stamp:
+                    return cached[1]
+                self._discard(key)
+                return default
+
+            entry = self._index.get(key)
+            if entry is None:
+                return default
+            if entry[0] != stamp:
+                self._discard(key)
+                return default
+
+            value = self._read(key, entry)
+            if value is _CORRUPT:
+                return default
+            self._values[key] = (stamp, value)
+            return value
+
+    def put(self, key : Hashable, value : Any, stamp : Hashable = None) -> None:
+        """
+        Stores a value, replacing any previous one of the key
+
+        :param key: The key
+        :param value: The value, which must be picklable
+        :param stamp: The validation stamp, compared with the one passed to get
+        """
+
+        with self._lock:
+            self._ensure_loaded()
+            self._index.pop(key, None)
+            self._values[key] = (stamp, value)
+            self._dirty.add(key)
+            self._modified = True
+
+    def remove(self, key : Hashable) -> None:
+        """
+        Removes a value, if any
+
+        :param key: The key
+        """
+
+        with self._lock:
+            self._ensure_loaded()
+            self._discard(key)
+
+    def clear(self) -> None:
+        """
+        Removes all values
+        """
+
+        with self._lock:
+            self._ensure_loaded()
+            self._modified = self._modified or bool(self._index or self._values)
+            self._index.clear()
+            self._values.clear()
+            self._dirty.clear()
+
+    def load_async(self) -> None:
+        """
+        Loads the file in the background, so that the first access does not wait for it
+        """
+
+        def _load():
+            with self._lock:
+                self._ensure_loaded()
+
+        sublime.set_timeout_async(_load, 0)
+
+    def save(self) -> None:
+        """
+        Writes the file if modified. Values read from the previous file are copied as they are,
+        without unpickling them.
+        """
+
+        import pickle
+
+        with self._lock:
+            if not self._modified:
+                return
+
+            tmp_path = f"{self._path}.tmp"
+            index = {}
+            try:
+                os.makedirs(os.path.dirname(self._path), exist_ok = True)
+                with open(tmp_path, "wb") as f:
+                    f.write(bytes(_HEADER.size))
+                    offset = _HEADER.size
+
+                    def _write(key, stamp, data, crc):
+                        nonlocal offset
+                        f.write(data)
+                        index[key] = (stamp, offset, len(data), crc)
+                        offset += len(data)
+
+                    for key, (stamp, entry_offset, length, crc) in self._index.items():
+                        _write(key, stamp, self._mmap[entry_offset:entry_offset + length], crc)
+
+                    for key in self._dirty:
+                        stamp, value = self._values[key]
+                        try:
+                            data = pickle.dumps(value, protocol = pickle.HIGHEST_PROTOCOL)
+                        except Exception as e:
+                            _logger.warning(f"Failed pickling cache value '{key}': {e}")
+                            continue
+                        _write(key, stamp, data, zlib.crc32(data))
+
+                    index_data = pickle.dumps((self._version, index),
+                        protocol = pickle.HIGHEST_PROTOCOL)
+                    f.write(index_data)
+                    f.seek(0)
+                    f.write(_HEADER.pack(_MAGIC, FORMAT_VERSION, len(index), offset,
+                        len(index_data), zlib.crc32(index_data)))
+
+                # A mapped file can't be replaced on Windows
+                self._close_mmap()
+                os.replace(tmp_path, self._path)
+            except OSError as e:
+                _logger.warning(f"Failed saving cache '{self._path}': {e}")
+                try:
+                    os.remove(tmp_path)
+                except OSError:
+                    pass
+                if self._mmap is None and self._index:
+                    # The previous file is unchanged, so the index still applies to it
+                    self._remap()
+                return
+
+            self._dirty.clear()
+            self._modified = False
+            _logger.debug(f"Saved {len(index)} values to cache '{self._path}'.")
+
+            # Map the new file, keeping the unpickled values
+            self._loaded = False
+            self._index = {}
+            self._ensure_loaded()
+
+    def save_async(self) -> None:
+        """
+        Writes the file in the background if modified
+        """
+
+        sublime.set_timeout_async(self.save, 0)
+
+    def close(self) -> None:
+        """
+        Unmaps the file and drops all values from memory, without saving. The file is loaded
+        again on next access.
+        """
+
+        with self._lock:
+            self._close_mmap()
+            self._index.clear()
+            self._values.clear()
+            self._dirty.clear()
+            self._modified = False
+            self._loaded = False
+
+    def _ensure_loaded(self) -> None:
+        """
+        Maps the file and reads its index, unless already done. Must be called with the lock held.
+        """
+
+        if self._loaded:
+            return
+        self._loaded = True
+
+        import mmap
+        import pickle
+
+        try:
+            with open(self._path, "rb") as f:
+                header = f.read(_HEADER.size)
+                if len(header) < _HEADER.size:
+                    raise ValueError("Truncated header")
+                magic, format_version, count, index_offset, index_size, index_crc = \
+                    _HEADER.unpack(header)
+                if magic != _MAGIC:
+                    raise ValueError("Not a cache file")
+                if format_version != FORMAT_VERSION:
+                    _logger.debug(f"Ignoring cache '{self._path}' of format {format_version}.")
+                    return
+                mapped = mmap.mmap(f.fileno(), 0, access = mmap.ACCESS_READ)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            _logger.warning(f"Failed loading cache '{self._path}': {e}")
+            return
+
+        try:
+            index_data = mapped[index_offset:index_offset + index_size]
+            if len(index_data) != index_size or zlib.crc32(index_data) != index_crc:
+                raise ValueError("Checksum mismatch")
+            version, index = pickle.loads(index_data)
+            if len(index) != count:
+                raise ValueError("Entry count mismatch")
+        except Exception as e:
+            _logger.warning(f"Discarding corrupt cache '{self._path}': {e}")
+            mapped.close()
+            return
+
+        if version != self._version:
+            _logger.debug(f"Ignoring cache '{self._path}' of version {version}.")
+            mapped.close()
+            return
+
+        self._mmap = mapped
+        self._index = index
+        _logger.debug(f"Loaded index of {count} values from cache '{self._path}'.")
+
+    def _read(self, key : Hashable, entry : tuple) -> Any:
+        """
+        Reads and unpickles a value from the file, discarding it if corrupt. Must be called with
+        the lock held.
+
+        :param key: The key
+        :param entry: The (stamp, offset, length, crc) of the value
+        :returns: The value, or _CORRUPT
+        """
+
+        import pickle
+
+        _, offset, length, crc = entry
+        try:
+            if self._mmap is None:
+                raise ValueError("File not mapped")
+            data = self._mmap[offset:offset + length]
+            if len(data) != length or zlib.crc32(data) != crc:
+                raise ValueError("Checksum mismatch")
+            return pickle.loads(data)
+        except Exception as e:
+            _logger.warning(f"Discarding corrupt cache value '{key}' of '{self._path}': {e}")
+            self._discard(key)
+            return _CORRUPT
+
+    def _discard(self, key : Hashable) -> None:
+        """
+        Removes a value. Must be called with the lock held.
+
+        :param key: The key
+        """
+
+        in_index = self._index.pop(key, None) is not None
+        in_values = self._values.pop(key, None) is not None
+        if in_index or in_values:
+            self._modified = True
+        self._dirty.discard(key)
+
+    def _remap(self) -> None:
+        """
+        Maps the file again after it was unmapped for a failed save. If that fails, the values
+        only in the file are dropped and the unpickled ones are kept to be written. Must be called
+        with the lock held.
+        """
+
+        import mmap
+
+        try:
+            with open(self._path, "rb") as f:
+                self._mmap = mmap.mmap(f.fileno(), 0, access = mmap.ACCESS_READ)
+        except (OSError, ValueError) as e:
+            _logger.warning(f"Failed mapping cache '{self._path}' again: {e}")
+            self._dirty.update(key for key in self._index if key in self._values)
+            self._index.clear()
+            self._modified = True
+
+    def _close_mmap(self) -> None:
+        """
+        Unmaps the file, if mapped. Must be called with the lock held.
+        """
+
+        if self._mmap is None:
+            return
+        self._mmap.close()
+        self._mmap = None
+
+def get_store(name : str, version : Hashable = None) -> CacheStore:
+    """
+    Gets a store in the Sublime cache directory of the package, shared by all users
+
+    :param name: The name of the store, used as file name
+    :param version: The version of the data, e.g. the plugin version
+    """
+
+    with _stores_lock:
+        store = _stores.get(name)
+        if store is None:
+            path = os.path.join(sublime.cache_path(), __name__.split('.')[0], f"{name}.cache")
+            store = CacheStore(path, version)
+            _stores[name] = store
+        return store
+
+def save_all() -> None:
+    """
+    Writes the modified stores of get_store and closes them. Call when the plugin is unloaded.
+    """
+
+    with _stores_lock:
+        stores = list(_stores.values())
+        _stores.clear()
+
+    for store in stores:
+        store.save()
+        store.close()
@@ -0,0 +1,97 @@
+"""
+Module handling edits of many regions of a view at once
+"""
+
+import logging
+
+# Local logger
+_logger = logging.getLogger(__name__)
+
+import sublime
+import sublime_plugin
+
+from . import misc
+from typing import Callable, Iterable, Tuple, Union
+
+def bulk_replace(view  : sublime.View,
+                 edits : Iterable[Tuple[sublime.Region, str]]) -> None:
+    """
+    Replaces many regions of a view in a single edit (and undo step). The regions are given in
+    the coordinates of the buffer before the edit, so callers don't have to account for the
+    offsets moving as preceding regions are replaced. Empty regions are insertions.
+
+    Requires SublimeUtilBulkReplaceCommand to be imported into a plugin module for Sublime to
+    load it.
+
+    :param view:  The applicable view
+    :param edits: The (region, text) tuples, in any order. Regions must not overlap.
+    :raises ValueError: Raised if regions overlap
+    """
+
+    # Stable sort, so insertions at the same point are kept in given order
+    args = sorted(([region.begin(), region.end(), text] for region, text in edits),
+        key = lambda e : (e[0], e[1]))
+    if not args:
+        return
+
+    # Checked here, as run_command swallows exceptions of the command
+    for (_, previous_end, _), (begin, end, _) in zip(args, args[1:]):
+        if begin < previous_end:
+            raise ValueError(f"Region ({begin}, {end}) overlaps region ending at {previous_end}.")
+
+    _logger.debug(f"Applying {len(args)} edits to view {view.id()}.")
+    view.run_command(misc.class_name_to_command(SublimeUtilBulkReplaceCommand), {"edits": args})
+
+def replace_regions(view        : sublime.View,
+                    regions     : Iterable[sublime.Region],
+                    replacement : Union[str, Callable[[str], str]]) -> None:
+    """
+    Replaces many regions of a view in a single edit (and undo step), e.g. all regions of a
+    word search or a RegionSet
+
+    :param view:        The applicable view
+    :param regions:     The regions, in any order. Regions must not overlap.
+    :param replacement: The text to replace each region with, or a callable getting the text of
+                        a region and returning its replacement
+    :raises ValueError: Raised if regions overlap
+    """
+
+    if isinstance(replacement, str):
+        bulk_replace(view, ((region, replacement) for region in regions))
+        return
+
+    # Read the buffer once instead of once per region
+    text = view.substr(sublime.Region(0, view.size()))
+    bulk_replace(view,
+        ((region, replacement(text[region.begin():region.end()])) for region in regions))
+
+class SublimeUtilBulkReplaceCommand(sublime_plugin.TextCommand):
+    """
+    Applies many replacements given in the coordinates of the buffer before the edit. Use
+    bulk_replace rather than running it directly. Named after the util, so that its command name
+    doesn't clash with those of the packages embedding it.
+    """
+
+    def run(self, edit, edits):
+        """
+        :param edit: The edit token
+        :param edits: A list of [begin, end, text], sorted and not overlapping (see bulk_replace)
+        """
+
+        # Merge edits of adjacent regions into runs of (begin, end, [texts])
+        runs = []
+        for begin, end, text in edits:
+            if runs and begin == runs[-1][1]:
+                runs[-1][1] = end
+                runs[-1][2].append(text)
+            else:
+                runs.append([begin, end, [text]])
+
+        # Apply the runs in order, shifting each by the change in length of the preceding ones
+        delta = 0
+        for begin, end, texts in runs:
+            text = "".join(texts)
+            self.view.replace(edit, sublime.Region(begin + delta, end + delta), text)
+            delta += len(text) - (end - begin)
+
+        _logger.debug(f"Applied {len(edits)} edits as {len(runs)} replacements.")
@@ -0,0 +1,286 @@
+"""
+Module handling region highlights of views
+"""
+
+import logging
+
+# Local logger
+_logger = logging.getLogger(__name__)
+
+import sublime
+import sublime_plugin
+
+from .scheduler import Scheduler
+from array import array
+from bisect import bisect_left, bisect_right
+from typing import Iterable, List
+
+# Time in ms between checks of whether views with highlights were scrolled
+_SCROLL_POLL_INTERVAL = 500
+
+# Highlight managers per (view id, key)
+_managers = {}
+
+# Scheduler debouncing the pushes of all managers
+_scheduler = Scheduler()
+
+# Whether the scroll check is scheduled
+_polling = False
+
+class _SortedRegions():
+    """
+    An internal-only class holding regions sorted on begin point, without merging them (unlike
+    RegionSet), so that touching or overlapping highlights are drawn as given
+    """
+
+    def __init__(self, regions = ()):
+        """
+        Initializes the regions
+
+        :param regions: The sublime.Region, in any order
+        """
+
+        pairs = sorted((r.begin(), r.end()) for r in regions)
+        self._begins = array('q', (begin for begin, _ in pairs))
+        self._ends = array('q', (end for _, end in pairs))
+        self._max_length = max((end - begin for begin, end in pairs), default = 0)
+
+    def __len__(self):
+        return len(self._begins)
+
+    def to_regions(self):
+        """
+        Gets the regions
+
+        :returns: The list of sublime.Region
+        """
+
+        return [sublime.Region(b, e) for b, e in zip(self._begins, self._ends)]
+
+    def overlapping(self, area):
+        """
+        Gets the regions overlapping or touching an area
+
+        :param area: The sublime.Region of the area
+        :returns: A tuple of (begin, end) pairs
+        """
+
+        # No region beginning before this can reach the area
+        first = bisect_left(self._begins, area.begin() - self._max_length)
+        last = bisect_right(self._begins, area.end())
+        return tuple((self._begins[i], self._ends[i]) for i in range(first, last)
+            if self._ends[i] >= area.begin())
+
+class HighlightManager():
+    """
+    Manages the highlighted regions of a key in a view. Only the regions in the visible area (plus
+    a margin) are pushed to the view, updates are coalesced, and nothing is pushed if the regions
+    to show did not change.
+
+    Sublime has no event for scrolling, so HighlightListener refreshes the managers on selection
+    changes, activation, text commands, hovering, and regularly checks the visible area of the
+    views. Call refresh() to push a change of the visible area right away.
+    """
+
+    def __init__(self,
+                 view           : sublime.View,
+                 key            : str,
+                 scope          : str = "",
+                 icon           : str = "",
+                 flags          : int = 0,
+                 *,
+                 margin_lines   : int = 100,
+                 delay          : int = 50):
+        """
+        Initializes the manager
+
+        :param view:            The applicable view
+        :param key:             The key of the regions in the view
+        :param scope:           The scope of the regions, see view.add_regions
+        :param icon:            The icon of the regions, see view.add_regions
+        :param flags:           The flags of the regions, see view.add_regions
+        :param margin_lines:    Number of lines outside the visible area to include
+        :param delay:           Time in ms to wait for further updates before pushing
+        """
+
+        self._view = view
+        self._key = key
+        self._scope = scope
+        self._icon = icon
+        self._flags = flags
+        self._margin_lines = margin_lines
+        self._delay = delay
+
+        self._regions = _SortedRegions()
+        # The (begin, end) pairs last pushed to the view, None if nothing pushed
+        self._pushed = None
+        # The visible region of the view when last pushed
+        self._visible = None
+
+    @property
+    def regions(self) -> List[sublime.Region]:
+        """
+        Property reflecting all regions to highlight, including those not pushed to the view
+        """
+
+        return self._regions.to_regions()
+
+    def set_regions(self, regions : Iterable[sublime.Region]) -> None:
+        """
+        Sets the regions to highlight
+
+        :param regions: The regions (or a RegionSet), in any order. Touching or overlapping
+                        regions are kept apart.
+        """
+
+        self._regions = _SortedRegions(regions)
+        self._schedule()
+        _start_polling()
+
+    def refresh(self) -> None:
+        """
+        Pushes the regions in the current visible area, if they changed
+        """
+
+        self._schedule()
+
+    def clear(self) -> None:
+        """
+        Removes all highlighted regions
+        """
+
+        _scheduler.cancel(self._scheduler_key)
+        self._regions = _SortedRegions()
+        if self._pushed is not None:
+            self._view.erase_regions(self._key)
+            self._pushed = None
+
+    @property
+    def _scheduler_key(self) -> tuple:
+        """
+        Property reflecting the key of the pushes of this manager in the scheduler
+        """
+
+        return (self._view.id(), self._key)
+
+    def _schedule(self) -> None:
+        """
+        Schedules a push, replacing any previously scheduled one
+        """
+
+        _scheduler.debounce(self._scheduler_key, self._delay, self._push)
+
+    def _push(self) -> None:
+        """
+        Pushes the regions in the visible area to the view, unless unchanged
+        """
+
+        if not self._view.is_valid():
+            return
+
+        visible = self._view.visible_region()
+        self._visible = visible
+        first_row = self._view.rowcol(visible.begin())[0]
+        last_row = self._view.rowcol(visible.end())[0]
+        area = sublime.Region(
+            self._view.text_point(max(0, first_row - self._margin_lines), 0),
+            self._view.text_point(last_row + self._margin_lines + 1, 0))
+
+        regions = self._regions.overlapping(area)
+        if regions == self._pushed:
+            return
+
+        _logger.debug(f"Pushing {len(regions)} of {len(self._regions)} regions of '{self._key}'.")
+        self._view.add_regions(self._key, [sublime.Region(b, e) for b, e in regions], self._scope,
+            self._icon, self._flags)
+        self._pushed = regions
+
+    def _check_scrolled(self) -> None:
+        """
+        Pushes the regions if the visible area changed since the last push
+        """
+
+        if self._view.is_valid() and self._view.visible_region() != self._visible:
+            self._schedule()
+
+def get_manager(view : sublime.View, key : str, *args, **kwargs) -> HighlightManager:
+    """
+    Gets the highlight manager of a key in a view, creating it on first request
+
+    :param view: The applicable view
+    :param key: The key of the regions in the view
+    :param args: Passed to HighlightManager when created
+    :param kwargs: Passed to HighlightManager when created
+    """
+
+    manager = _managers.get((view.id(), key))
+    if manager is None:
+        manager = HighlightManager(view, key, *args, **kwargs)
+        _managers[(view.id(), key)] = manager
+    return manager
+
+def _start_polling() -> None:
+    """
+    Starts checking regularly whether views with highlights were scrolled, unless already started
+    """
+
+    global _polling
+    if not _polling:
+        _polling = True
+        sublime.set_timeout(_poll, _SCROLL_POLL_INTERVAL)
+
+def _poll() -> None:
+    """
+    Checks whether the visible views with highlights were scrolled, and continues while there are
+    highlights
+    """
+
+    global _polling
+
+    active_views = set()
+    for window in sublime.windows():
+        for group in range(window.num_groups()):
+            view = window.active_view_in_group(group)
+            if view is not None:
+                active_views.add(view.id())
+
+    for (view_id, _), manager in list(_managers.items()):
+        if view_id in active_views:
+            manager._check_scrolled()
+
+    if any(len(manager._regions) > 0 for manager in _managers.values()):
+        sublime.set_timeout(_poll, _SCROLL_POLL_INTERVAL)
+    else:
+        _polling = False
+
+class HighlightListener(sublime_plugin.EventListener):
+    """
+    Refreshes the highlight managers when the visible area may have changed and discards them
+    when views close. Import it into a plugin module for Sublime to load it.
+    """
+
+    def on_activated(self, view):
+        self._refresh(view)
+
+    def on_selection_modified(self, view):
+        self._refresh(view)
+
+    def on_post_text_command(self, view, command_name, args):
+        # E.g. scroll_lines, show_at_center or moving by pages
+        self._refresh(view)
+
+    def on_hover(self, view, point, hover_zone):
+        # The mouse is over the view, e.g. after scrolling with the wheel
+        self._refresh(view)
+
+    def on_close(self, view):
+        view_id = view.id()
+        for key in [key for key in _managers if key[0] == view_id]:
+            _scheduler.cancel(key)
+            del _managers[key]
+
+    def _refresh(self, view):
+        view_id = view.id()
+        for key, manager in _managers.items():
+            if key[0] == view_id:
+                manager.refresh()
@@ -0,0 +1,305 @@
+"""
+Module handling prioritized background jobs
+"""
+
+import logging
+
+# Local logger
+_logger = logging.getLogger(__name__)
+
+import sublime
+import itertools
+import queue
+import threading
+import time
+
+from typing import Callable, Iterable, Union
+
+# Priorities of jobs. Lower values are run first.
+PRIORITY_HIGH = 0
+PRIORITY_NORMAL = 10
+PRIORITY_LOW = 20
+
+# The queue shared by all users of get_queue
+_shared_queue = None
+
+class JobCancelled(Exception):
+    """
+    Raised inside a job when it has been cancelled
+    """
+
+class CancellationToken():
+    """
+    A token through which a job is told to stop. Jobs are expected to check it regularly.
+    """
+
+    def __init__(self):
+        self._event = threading.Event()
+
+    @property
+    def is_cancelled(self) -> bool:
+        """
+        Property reflecting whether cancellation has been requested
+        """
+
+        return self._event.is_set()
+
+    def cancel(self) -> None:
+        """
+        Requests cancellation
+        """
+
+        self._event.set()
+
+    def raise_if_cancelled(self) -> None:
+        """
+        Raises JobCancelled if cancellation has been requested
+
+        :raises JobCancelled: Raised if cancelled
+        """
+
+        if self._event.is_set():
+            raise JobCancelled()
+
+class Job():
+    """
+    A job submitted to a JobQueue
+    """
+
+    def __init__(self, name, func, args, priority, on_done, on_error):
+        """
+        Initializes the job
+
+        :param name: The name of the job, used for logging
+        :param func: The callable to run, with the token as first argument followed by args
+        :param args: The arguments of the callable
+        :param priority: The priority (lower runs first)
+        :param on_done: Callback run on the main thread with the result, or None
+        :param on_error: Callback run on the main thread with the exception, or None
+        """
+
+        self.name = name
+        self.priority = priority
+        self.token = CancellationToken()
+        self._func = func
+        self._args = args
+        self._on_done = on_done
+        self._on_error = on_error
+        self._submitted_at = time.monotonic()
+
+    def __str__(self):
+        return self.name
+
+    def cancel(self) -> None:
+        """
+        Requests cancellation of the job. If not yet started it will not be run.
+        """
+
+        self.token.cancel()
+
+    def _run(self) -> None:
+        """
+        Runs the job (on a worker thread) and delivers its result on the main thread
+        """
+
+        if self.token.is_cancelled:
+            _logger.debug(f"Skipping cancelled job '{self}'.")
+            return
+
+        started_at = time.monotonic()
+        try:
+            result = self._func(self.token, *self._args)
+        except JobCancelled:
+            _logger.debug(f"Job '{self}' cancelled after {_ms_since(started_at):.1f} ms.")
+            return
+        except Exception as e:
+            _logger.error(f"Job '{self}' failed after {_ms_since(started_at):.1f} ms: {e}")
+            if self._on_error is not None:
+                # Bind the exception now, as the name is deleted when the except block ends
+                sublime.set_timeout(lambda error = e : self._on_error(error), 0)
+            return
+
+        _logger.debug(f"Job '{self}' finished in {_ms_since(started_at):.1f} ms "
+            f"(queued {(started_at - self._submitted_at) * 1000:.1f} ms).")
+        if self._on_done is not None and not self.token.is_cancelled:
+            sublime.set_timeout(lambda : self._deliver(result), 0)
+
+    def _deliver(self, result) -> None:
+        """
+        Delivers the result (on the main thread), unless cancelled meanwhile
+
+        :param result: The result of the job
+        """
+
+        if not self.token.is_cancelled:
+            self._on_done(result)
+
+class JobQueue():
+    """
+    A bounded pool of worker threads running jobs in order of priority
+    """
+
+    def __init__(self, max_workers : int = 2):
+        """
+        Initializes the queue. Workers are started when the first job is submitted.
+
+        :param max_workers: Number of worker threads
+        """
+
+        self._max_workers = max_workers
+        self._queue = queue.PriorityQueue()
+        # Sequence number keeping jobs of equal priority in order of submission
+        self._counter = itertools.count()
+        self._workers = []
+        self._lock = threading.Lock()
+
+    def submit(self,
+               func     : Callable,
+               *args,
+               name     : Union[str, None] = None,
+               priority : int = PRIORITY_NORMAL,
+               on_done  : Union[Callable, None] = None,
+               on_error : Union[Callable, None] = None) -> Job:
+        """
+        Submits a job
+
+        :param func: The callable to run, with the cancellation token as first argument
+        :param args: Further arguments of the callable
+        :param name: The name of the job, used for logging
+        :param priority: The priority (lower runs first)
+        :param on_done: Callback run on the main thread with the result
+        :param on_error: Callback run on the main thread with the exception if failing
+        :returns: The Job
+        """
+
+        job = Job(name or getattr(func, '__name__', str(func)), func, args, priority, on_done,
+            on_error)
+        self._ensure_workers()
+        self._queue.put((priority, next(self._counter), job))
+        return job
+
+    def shutdown(self) -> None:
+        """
+        Cancels all queued jobs and stops the workers once their current jobs are done
+        """
+
+        with self._lock:
+            while True:
+                try:
+                    _, _, job = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                job.cancel()
+
+            for _ in self._workers:
+                self._queue.put((float('inf'), next(self._counter), None))
+            self._workers = []
+
+    def _ensure_workers(self) -> None:
+        """
+        Starts the worker threads, unless already started
+        """
+
+        with self._lock:
+            while len(self._workers) < self._max_workers:
+                worker = threading.Thread(target = self._work, daemon = True,
+                    name = f"{__name__}-worker-{len(self._workers)}")
+                worker.start()
+                self._workers.append(worker)
+
+    def _work(self) -> None:
+        """
+        Runs jobs from the queue until told to stop
+        """
+
+        while True:
+            _, _, job = self._queue.get()
+            if job is None:
+                return
+            job._run()
+
+def get_queue() -> JobQueue:
+    """
+    Gets the queue shared by all users, so that their jobs are coordinated
+    """
+
+    global _shared_queue
+    if _shared_queue is None:
+        _shared_queue = JobQueue()
+    return _shared_queue
+
+def shutdown() -> None:
+    """
+    Shuts down the shared queue. Call when the plugin is unloaded.
+    """
+
+    global _shared_queue
+    if _shared_queue is not None:
+        _shared_queue.shutdown()
+        _shared_queue = None
+
+def for_each_chunked(token      : CancellationToken,
+                     items      : Iterable,
+                     func       : Callable,
+                     chunk_size : int = 500) -> None:
+    """
+    Calls a function for each item (in a job), yielding to other threads and checking for
+    cancellation between chunks of items
+
+    :param token: The cancellation token of the job
+    :param items: The items
+    :param func: The function to call with each item
+    :param chunk_size: Number of items per chunk
+    :raises JobCancelled: Raised if cancelled
+    """
+
+    for i, item in enumerate(items):
+        if i % chunk_size == 0:
+            token.raise_if_cancelled()
+            # Release the GIL, letting the plugin host run
+            time.sleep(0)
+        func(item)
+
+def for_each_chunked_on_main(items      : Iterable,
+                             func       : Callable,
+                             chunk_size : int = 100,
+                             on_done    : Union[Callable, None] = None,
+                             token      : Union[CancellationToken, None] = None) -> None:
+    """
+    Calls a function for each item on the main thread, returning to the host between chunks of
+    items so that the UI stays responsive. For work that must use the API on the main thread.
+
+    :param items: The items
+    :param func: The function to call with each item
+    :param chunk_size: Number of items per chunk
+    :param on_done: Callback run when all items are processed
+    :param token: Cancellation token stopping the processing, or None
+    """
+
+    iterator = iter(items)
+
+    def _next_chunk():
+        if token is not None and token.is_cancelled:
+            return
+
+        count = 0
+        for item in itertools.islice(iterator, chunk_size):
+            func(item)
+            count += 1
+
+        if count == chunk_size:
+            sublime.set_timeout(_next_chunk, 0)
+        elif on_done is not None:
+            on_done()
+
+    _next_chunk()
+
+def _ms_since(start : float) -> float:
+    """
+    Gets the time since a point in time
+
+    :param start: The point in time (time.monotonic)
+    :returns: The time in ms
+    """
+
+    return (time.monotonic() - start) * 1000
@@ -0,0 +1,280 @@
+"""
+Module handling journals of the modifications of buffers, so that caches derived from their
+contents can be updated incrementally instead of rebuilt
+"""
+
+import logging
+
+# Local logger
+_logger = logging.getLogger(__name__)
+
+import sublime
+import sublime_plugin
+
+from array import array
+from bisect import bisect_right
+from typing import Iterable, List, Tuple, Union
+
+# Max number of modifications kept per buffer. Older ones are dropped, so that changes since
+# their change count can no longer be determined.
+MAX_ENTRIES = 10000
+
+# Journals per buffer id
+_journals = {}
+
+class Journal():
+    """
+    The modifications of a buffer, stored as arrays of offset, removed length and inserted length,
+    each stamped with the change count of the buffer after it. Offsets are in the coordinates of
+    the buffer right before each modification.
+    """
+
+    def __init__(self, change_count : int, max_entries : int = MAX_ENTRIES):
+        """
+        Initializes an empty journal
+
+        :param change_count: The current change count of the buffer
+        :param max_entries: Max number of modifications kept
+        """
+
+        self._max_entries = max_entries
+        self._offsets = array('q')
+        self._removed = array('q')
+        self._inserted = array('q')
+        self._stamps = array('q')
+        # The change count since which all modifications are kept
+        self._base = change_count
+        self._change_count = change_count
+
+    def __len__(self) -> int:
+        return len(self._stamps)
+
+    @property
+    def change_count(self) -> int:
+        """
+        Property reflecting the change count of the buffer after the last recorded modification
+        """
+
+        return self._change_count
+
+    @property
+    def base_change_count(self) -> int:
+        """
+        Property reflecting the oldest change count changes can be determined since
+        """
+
+        return self._base
+
+    def covers(self, since : int) -> bool:
+        """
+        Determines if the changes since a change count can be determined
+
+        :param since: The change count
+        """
+
+        return self._base <= since <= self._change_count
+
+    def record(self, change_count : int, changes : Iterable[Tuple[int, int, int]]) -> None:
+        """
+        Records modifications
+
+        :param change_count: The change count of the buffer after the modifications
+        :param changes: The (offset, removed length, inserted length) tuples, in order
+        """
+
+        for offset, removed, inserted in changes:
+            self._offsets.append(offset)
+            self._removed.append(removed)
+            self._inserted.append(inserted)
+            self._stamps.append(change_count)
+        self._change_count = change_count
+
+        if len(self._stamps) > self._max_entries:
+            self._trim()
+
+    def reset(self, change_count : int) -> None:
+        """
+        Drops all modifications, e.g. when the buffer was reverted without reporting them
+
+        :param change_count: The current change count of the buffer
+        """
+
+        del self._offsets[:]
+        del self._removed[:]
+        del self._inserted[:]
+        del self._stamps[:]
+        self._base = change_count
+        self._change_count = change_count
+
+    def changes_since(self, since : int) -> Union[List[Tuple[int, int, int]], None]:
+        """
+        Gets the modifications since a change count
+
+        :param since: The change count
+        :returns: The list of (offset, removed length, inserted length) tuples in order, or None
+                  if no longer (or not yet) known
+        """
+
+        if not self.covers(since):
+            return None
+        start = bisect_right(self._stamps, since)
+        return list(zip(self._offsets[start:], self._removed[start:], self._inserted[start:]))
+
+    def map_offsets(self, offsets : Iterable[int], since : int, *,
+                    right : bool = False) -> Union[List[int], None]:
+        """
+        Maps offsets in the buffer at a change count to the current buffer
+
+        :param offsets: The offsets
+        :param since: The change count of the buffer the offsets are in
+        :param right: Whether offsets at an insertion, or within removed text, are mapped to the
+                      end of the inserted text instead of its beginning
+        :returns: The list of mapped offsets, or None if the changes are no longer known
+        """
+
+        changes = self.changes_since(since)
+        if changes is None:
+            return None
+
+        mapped = list(offsets)
+        for offset, removed, inserted in changes:
+            end = offset + removed
+            delta = inserted - removed
+            for i, point in enumerate(mapped):
+                if point > end or (point == end and removed > 0):
+                    mapped[i] = point + delta
+                elif point > offset or (point == offset and right):
+                    mapped[i] = offset + inserted if right else offset
+        return mapped
+
+    def map_offset(self, offset : int, since : int, *, right : bool = False) -> Union[int, None]:
+        """
+        Maps an offset in the buffer at a change count to the current buffer
+
+        :param offset: The offset
+        :param since: The change count of the buffer the offset is in
+        :param right: Whether an offset at an insertion, or within removed text, is mapped to the
+                      end of the inserted text instead of its beginning
+        :returns: The mapped offset, or None if the changes are no longer known
+        """
+
+        mapped = self.map_offsets((offset,), since, right = right)
+        return mapped[0] if mapped is not None else None
+
+    def changed_regions_since(self, since : int) -> Union[List[sublime.Region], None]:
+        """
+        Gets the regions of the current buffer modified since a change count, with overlapping or
+        touching modifications coalesced. Removals without insertion are empty regions.
+
+        :param since: The change count
+        :returns: The list of sorted regions, or None if the changes are no longer known
+        """
+
+        changes = self.changes_since(since)
+        if changes is None:
+            return None
+
+        # Sorted, non-overlapping [begin, end] in the coordinates after the changes so far
+        ranges = []
+        for offset, removed, inserted in changes:
+            end = offset + removed
+            delta = inserted - removed
+            merged = [offset, offset + inserted]
+            updated = []
+            for begin, range_end in ranges:
+                if range_end < offset:
+                    updated.append([begin, range_end])
+                elif begin > end:
+                    if merged is not None:
+                        updated.append(merged)
+                        merged = None
+                    updated.append([begin + delta, range_end + delta])
+                else:
+                    merged[0] = min(merged[0], begin)
+                    if range_end >= end:
+                        merged[1] = max(merged[1], range_end + delta)
+            if merged is not None:
+                updated.append(merged)
+            ranges = updated
+
+        return [sublime.Region(begin, end) for begin, end in ranges]
+
+    def _trim(self) -> None:
+        """
+        Drops the oldest modifications down to half of the max, keeping those of the same change
+        count together
+        """
+
+        count = len(self._stamps) - self._max_entries // 2
+        while count < len(self._stamps) and self._stamps[count] == self._stamps[count - 1]:
+            count += 1
+
+        self._base = self._stamps[count - 1]
+        del self._offsets[:count]
+        del self._removed[:count]
+        del self._inserted[:count]
+        del self._stamps[:count]
+        _logger.debug(f"Dropped {count} modifications from journal, now since {self._base}.")
+
+def get_journal(view : sublime.View) -> Union[Journal, None]:
+    """
+    Gets the journal of the buffer of a view, starting it on first request. Requires
+    JournalTextChangeListener to be imported into a plugin module for Sublime to load it.
+
+    :param view: The applicable view
+    :returns: The journal, or None if it lags behind the buffer, e.g. while modifications are yet
+              to be reported to the listener, so that its queries would miss them
+    """
+
+    buffer_id = view.buffer_id()
+    journal = _journals.get(buffer_id)
+    if journal is None:
+        journal = Journal(view.change_count())
+        _journals[buffer_id] = journal
+    elif journal.change_count != view.change_count():
+        _logger.debug(f"Journal of buffer {buffer_id} at change {journal.change_count} lags "
+            f"behind change {view.change_count()}.")
+        return None
+    return journal
+
+class JournalListener(sublime_plugin.EventListener):
+    """
+    Drops the journals of closed buffers. Import it into a plugin module for Sublime to load it.
+    """
+
+    def on_close(self, view):
+        if len(view.clones()) > 0:
+            return
+        _journals.pop(view.buffer_id(), None)
+
+class JournalTextChangeListener(sublime_plugin.TextChangeListener):
+    """
+    Records the modifications of buffers with a journal. Import it into a plugin module for
+    Sublime to load it.
+    """
+
+    @classmethod
+    def is_applicable(cls, buffer):
+        return True
+
+    def on_text_changed(self, changes):
+        journal = _journals.get(self.buffer.id())
+        if journal is None:
+            return
+        journal.record(self.buffer.primary_view().change_count(),
+            ((change.a.pt, change.b.pt - change.a.pt, len(change.str)) for change in changes))
+
+    def on_revert(self):
+        self._reset()
+
+    def on_reload(self):
+        self._reset()
+
+    def _reset(self):
+        """
+        Drops the modifications of the buffer, which are not reported for reverts and reloads
+        """
+
+        journal = _journals.get(self.buffer.id())
+        if journal is not None:
+            journal.reset(self.buffer.primary_view().change_count())
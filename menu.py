@@ -6,8 +6,13 @@ from . import misc
 from . import user_input
 
 import sublime
+import itertools
+import time
 from collections import namedtuple
 
+# Max time in seconds between posting batches of asynchronously provided entries to the panel
+_ASYNC_BATCH_INTERVAL = 0.1
+
 # Some named tuples for the menu contents to simplfy implementation
 _MenuContents = namedtuple('MenuContents', ['title', 'description', 'annotation'])
 _MenuItemContents = namedtuple('MenuItemContents', ['title', 'description', 'annotation', 'callback'])
@@ -30,6 +35,17 @@ class QuickMenu(menu.Menu):
         super().__init__(_MenuContents(title, description, annotation),
             cancel_callback = cancel_callback)
 
+        # The quick panel items shown for this menu, built on first use and reused until the menu
+        # is modified
+        self._panel_items = None
+
+        # The QuickMenu this is a sub menu of, and the titles leading to it from the top level
+        self._parent_menu = None
+        self._breadcrumb = None
+
+        # The flattened index of all items in the tree (only kept by the top level menu)
+        self._search_index = None
+
     def add_menu(self, title, description = "", annotation = ""):
         """
         Adds a sub menu
@@ -42,7 +58,41 @@ class QuickMenu(menu.Menu):
         """
 
         contents = QuickMenu(title, description, annotation)
-        super().add(contents)
+        self._add_item(contents)
+        return contents
+
+    def add_provider(self, title, description = "", annotation = "", *, provider, ttl = None,
+                     page_size = None, asynchronous = False, batch_size = 100):
+        """
+        Adds a sub menu whose items are provided by a callable the first time it is entered
+
+        The provider is called without arguments and shall return an iterable (e.g. a generator) of
+        entries. Each entry is either a QuickMenu (added as a sub menu) or a tuple of
+        (title, description, annotation, callback) (added as if by add_callback).
+
+        :param title: The title
+        :param description: The description (shown below the title)
+        :param annotation: The annotation (shown to the right)
+        :param provider: The callable providing the items
+        :param ttl: Number of seconds the provided items are valid before the provider is called
+                    again, or None to keep them forever
+        :param page_size: Max number of entries to take from the provider at a time, or None to
+                          take them all. A 'More...' item is added to load the next page.
+        :param asynchronous: Whether to run the provider in the background. The panel is shown
+                             immediately and updated as batches of entries arrive.
+        :param batch_size: Max number of entries per update when asynchronous
+
+        :raises ValueError: Raised if both paging and asynchronous population are requested
+        :returns: The sub QuickMenu
+        """
+
+        if asynchronous and page_size is not None:
+            raise ValueError("Paging is not supported for asynchronously provided menus.")
+
+        contents = _ProviderQuickMenu(title, description, annotation,
+            provider = provider, ttl = ttl, page_size = page_size,
+            asynchronous = asynchronous, batch_size = batch_size)
+        self._add_item(contents)
         return contents
 
     def add_callback(self, title, description = "", annotation = "", *, callback):
@@ -56,9 +106,10 @@ class QuickMenu(menu.Menu):
         """
 
         contents = _QuickItem(title, description, annotation, callback)
-        super().add(contents)
+        self._add_item(contents)
 
-    def add_input(self, title, input_caption, input_initial_text, description = "", annotation = "", *, input_callback):
+    def add_input(self, title, input_caption, input_initial_text, description = "", annotation = "", *, input_callback,
+                  input_validator = None, asynchronous_validation = False):
         """
         Adds an item with a request for user input
 
@@ -69,6 +120,9 @@ class QuickMenu(menu.Menu):
         :param annotation: The annotation of the item (shown to the right)
         :param input_callback: The callback to be run to validate and apply the results of the
                                given input.
+        :param input_validator: The callback validating the input while typing, returning an
+                                error message or None if valid, see user_input.show_input
+        :param asynchronous_validation: Whether to run input_validator on a background thread
         """
 
         def _item_callback(item, event):
@@ -79,11 +133,13 @@ class QuickMenu(menu.Menu):
                 caption = input_caption,
                 initial_text = input_initial_text,
                 on_done = lambda text : input_callback(text, event),
-                on_cancel = _on_cancel
+                on_cancel = _on_cancel,
+                validator = input_validator,
+                asynchronous_validation = asynchronous_validation
             )
 
         contents = _QuickItem(title, description, annotation, _item_callback)
-        super().add(contents)
+        self._add_item(contents)
 
     def add_command(self, title, description = "", annotation = "", *, command):
         """
@@ -105,7 +161,7 @@ class QuickMenu(menu.Menu):
             sublime.run_command(name)
 
         contents = _QuickItem(title, description, annotation, _command_callback)
-        super().add(contents)
+        self._add_item(contents)
         return contents
 
     def execute(self, *args, **kwargs):
@@ -114,21 +170,71 @@ class QuickMenu(menu.Menu):
         """
 
         _logger.debug(f"Showing QuickMenu {self}, selecting index {self.selected_index}")
-        items = []
-        for sub_item in self.items:
-            items.append(
+        sublime.active_window().show_quick_panel(
+            items = self.panel_items,
+            selected_index = self.selected_index,
+            on_select = self._on_select,
+            on_highlight = self._on_highlight,
+            flags = sublime.QuickPanelFlags.WANT_EVENT
+        )
+
+    @property
+    def panel_items(self):
+        """
+        Property reflecting the quick panel items of the menu. They are built on first access and
+        then reused until the menu is modified.
+
+        :returns: The list of sublime.QuickPanelItem
+        """
+
+        items = self._panel_items
+        if items is None:
+            items = [
                 sublime.QuickPanelItem(
                     trigger = sub_item.contents.title,
                     details = sub_item.contents.description,
                     annotation = sub_item.contents.annotation
                 )
-            )
+                for sub_item in self.items
+            ]
+            self._panel_items = items
+        return items
+
+    def precompute(self):
+        """
+        Builds the quick panel items of this menu and all of its sub menus
+        """
+
+        _logger.debug(f"Precomputing quick panel items of QuickMenu {self}.")
+        stack = [self]
+        while stack:
+            menu = stack.pop()
+            menu.panel_items  # Accessing the property builds and caches the items
+            stack.extend(item for item in menu.items if isinstance(item, QuickMenu))
+
+    def precompute_async(self):
+        """
+        Builds the quick panel items of this menu and all of its sub menus in the background
+        """
+
+        sublime.set_timeout_async(self.precompute, 0)
+
+    def search(self):
+        """
+        Opens a single quick panel with all items of the whole menu tree, annotated with the path
+        to them. Items of provider-backed menus are included once they have been populated.
+        """
+
+        index = self._get_search_index()
+        _logger.debug(f"Showing search of all {len(index.items)} items of QuickMenu {self}.")
+
+        def _on_select(selected, event):
+            if selected != -1:
+                index.items[selected].execute(event)
 
         sublime.active_window().show_quick_panel(
-            items = items,
-            selected_index = self.selected_index,
-            on_select = self._on_select,
-            on_highlight = self._on_highlight,
+            items = index.panel_items,
+            on_select = _on_select,
             flags = sublime.QuickPanelFlags.WANT_EVENT
         )
 
@@ -164,6 +270,474 @@ class QuickMenu(menu.Menu):
 
         self.select(index)
 
+    def _invalidate_panel_items(self):
+        """
+        Discards the cached quick panel items so they are rebuilt the next time they are shown
+        """
+
+        self._panel_items = None
+
+    def _add_item(self, contents, searchable = True):
+        """
+        Adds a sub menu or item and updates the caches depending on it
+
+        :param contents: The QuickMenu or _QuickItem
+        :param searchable: Whether the item shall be included in the search index
+        """
+
+        super().add(contents)
+        self._invalidate_panel_items()
+
+        if isinstance(contents, QuickMenu):
+            contents._parent_menu = self
+            contents._breadcrumb = None
+            index = self._get_root()._search_index
+            if index is not None:
+                index.add_tree(contents)
+        elif searchable:
+            index = self._get_root()._search_index
+            if index is not None:
+                index.add(self, contents)
+
+    def _get_root(self):
+        """
+        Gets the top level menu of the tree
+
+        :returns: The top level QuickMenu
+        """
+
+        menu = self
+        while menu._parent_menu is not None:
+            menu = menu._parent_menu
+        return menu
+
+    def _get_breadcrumb(self):
+        """
+        Gets the titles of the menus leading to this menu, excluding the top level
+
+        :returns: The breadcrumb string
+        """
+
+        if self._breadcrumb is None:
+            if self._parent_menu is None:
+                self._breadcrumb = ""
+            else:
+                parent_breadcrumb = self._parent_menu._get_breadcrumb()
+                if parent_breadcrumb:
+                    self._breadcrumb = f"{parent_breadcrumb} › {self.contents.title}"
+                else:
+                    self._breadcrumb = self.contents.title
+        return self._breadcrumb
+
+    def _get_search_index(self):
+        """
+        Gets the search index of the tree, building it on first use
+
+        :returns: The _SearchIndex
+        """
+
+        root = self._get_root()
+        if root._search_index is None:
+            _logger.debug(f"Building search index of QuickMenu {root}.")
+            root._search_index = _SearchIndex()
+            root._search_index.add_tree(root)
+        return root._search_index
+
+    def _clear(self):
+        """
+        Removes all items of the menu
+        """
+
+        index = self._get_root()._search_index
+        if index is not None:
+            index.remove_tree(self)
+
+        self.items.clear()
+        self.select(0)
+        self._invalidate_panel_items()
+
+class _ProviderQuickMenu(QuickMenu):
+    """
+    An internal-only class representing a sub menu populated by a provider when entered
+    """
+
+    def __init__(self, title, description, annotation, *, provider, ttl, page_size,
+                 asynchronous, batch_size):
+        """
+        Initializes the provider-backed menu
+
+        :param title: The title
+        :param description: The description (shown below the title)
+        :param annotation: The annotation (shown to the right)
+        :param provider: The callable providing the items
+        :param ttl: Number of seconds the provided items are valid, or None for forever
+        :param page_size: Max number of entries to take from the provider at a time, or None
+        :param asynchronous: Whether to run the provider in the background
+        :param batch_size: Max number of entries per update when asynchronous
+        """
+
+        super().__init__(title, description, annotation)
+        self._provider = provider
+        self._ttl = ttl
+        self._page_size = page_size
+        self._asynchronous = asynchronous
+        self._batch_size = batch_size
+        self._entries = None
+        self._more_item = None
+        self._populated_at = None
+
+        # Incremented to cancel a running asynchronous population
+        self._generation = 0
+        self._loading = False
+        # Incremented for each shown panel, to ignore callbacks of panels replaced by a newer one
+        self._show_id = 0
+
+    def invalidate(self):
+        """
+        Discards the provided items so the provider is called again the next time it is entered
+        """
+
+        _logger.debug(f"Invalidating provided items of QuickMenu {self}.")
+        self._populated_at = None
+
+    def execute(self, *args, **kwargs):
+        """
+        Populates the menu from the provider if needed, then opens it
+        """
+
+        if not self._asynchronous:
+            if self._is_stale():
+                self._populate()
+            super().execute(*args, **kwargs)
+            return
+
+        if not self._loading and self._is_stale():
+            self._populate_async()
+        self._show()
+
+    def cancel(self):
+        """
+        Cancels any running population and closes the QuickMenu
+        """
+
+        self._cancel_population()
+        super().cancel()
+
+    def _is_stale(self):
+        """
+        Determines if the menu must be (re)populated from the provider
+
+        :returns: True if stale
+        """
+
+        if self._populated_at is None:
+            return True
+
+        return self._ttl is not None and time.monotonic() - self._populated_at > self._ttl
+
+    def _populate(self):
+        """
+        Clears the menu and adds the first page of entries from the provider
+        """
+
+        _logger.debug(f"Populating QuickMenu {self} from provider {self._provider}.")
+        self._clear()
+        self._entries = iter(self._provider())
+        self._more_item = None
+        self._populated_at = time.monotonic()
+        self._add_page()
+
+    def _add_page(self):
+        """
+        Adds the next page of entries from the provider, followed by a 'More...' item if the
+        provider has entries left
+        """
+
+        if self._more_item is not None:
+            self.items.remove(self._more_item)
+            self._more_item = None
+            self._invalidate_panel_items()
+
+        count = 0
+        for entry in self._entries:
+            self._add_entry(entry)
+            count += 1
+            if self._page_size is not None and count >= self._page_size:
+                break
+        else:
+            # The provider is exhausted
+            self._entries = None
+            return
+
+        # Peek to avoid adding a 'More...' item for an empty page
+        try:
+            entry = next(self._entries)
+        except StopIteration:
+            self._entries = None
+            return
+        self._entries = itertools.chain([entry], self._entries)
+
+        self._more_item = _QuickItem("More...", f"Show the next {self._page_size} items", "",
+            self._on_more)
+        self._add_item(self._more_item, searchable = False)
+
+    def _on_more(self, item, *args, **kwargs):
+        """
+        Run when the 'More...' item is applied. Loads the next page and re-opens the menu on the
+        first new item.
+        """
+
+        index = len(self.items) - 1
+        self._add_page()
+        self.select(index)
+        self.execute()
+
+    def _add_entry(self, entry):
+        """
+        Adds a single entry from the provider
+
+        :param entry: A QuickMenu or a tuple of (title, description, annotation, callback)
+        """
+
+        if isinstance(entry, QuickMenu):
+            self._add_item(entry)
+        else:
+            title, description, annotation, callback = entry
+            self.add_callback(title, description, annotation, callback = callback)
+
+    def _populate_async(self):
+        """
+        Clears the menu and starts running the provider in the background
+        """
+
+        _logger.debug(f"Populating QuickMenu {self} asynchronously from provider {self._provider}.")
+        self._clear()
+        self._generation += 1
+        self._loading = True
+        self._populated_at = time.monotonic()
+        generation = self._generation
+        sublime.set_timeout_async(lambda : self._run_provider(generation), 0)
+
+    def _cancel_population(self):
+        """
+        Stops a running asynchronous population. The menu is repopulated the next time it is
+        entered.
+        """
+
+        if self._loading:
+            _logger.debug(f"Cancelling population of QuickMenu {self}.")
+            self._generation += 1
+            self._loading = False
+            self._populated_at = None
+
+    def _run_provider(self, generation):
+        """
+        Runs the provider (in the background), posting its entries to the main thread in batches
+
+        :param generation: The generation of the population, used to detect cancellation
+        """
+
+        batch = []
+        last_post = time.monotonic()
+        try:
+            for entry in self._provider():
+                if generation != self._generation:
+                    _logger.debug(f"Population of QuickMenu {self} cancelled.")
+                    return
+
+                batch.append(entry)
+                now = time.monotonic()
+                if len(batch) >= self._batch_size or now - last_post >= _ASYNC_BATCH_INTERVAL:
+                    self._post_batch(generation, batch, False)
+                    batch = []
+                    last_post = now
+        except Exception as e:
+            _logger.error(f"Provider {self._provider} of QuickMenu {self} failed: {e}")
+
+        self._post_batch(generation, batch, True)
+
+    def _post_batch(self, generation, batch, done):
+        """
+        Posts a batch of entries to be added on the main thread
+
+        :param generation: The generation of the population
+        :param batch: The list of entries
+        :param done: Whether this is the last batch
+        """
+
+        sublime.set_timeout(lambda : self._add_batch(generation, batch, done), 0)
+
+    def _add_batch(self, generation, batch, done):
+        """
+        Adds a batch of entries and re-shows the panel, keeping the current selection
+
+        :param generation: The generation of the population
+        :param batch: The list of entries
+        :param done: Whether this is the last batch
+        """
+
+        if generation != self._generation:
+            return
+
+        for entry in batch:
+            self._add_entry(entry)
+
+        if done:
+            _logger.debug(f"Finished populating QuickMenu {self} with {len(self.items)} items.")
+            self._loading = False
+
+        if batch or done:
+            self._show()
+
+    def _show(self):
+        """
+        Shows the panel, with a trailing placeholder item while entries are still loading
+        """
+
+        self._show_id += 1
+        show_id = self._show_id
+
+        items = self.panel_items
+        if self._loading:
+            items = items + [sublime.QuickPanelItem(trigger = "Loading...")]
+
+        sublime.active_window().show_quick_panel(
+            items = items,
+            selected_index = min(self.selected_index, len(items) - 1),
+            on_select = lambda index, event : self._on_async_select(show_id, index, event),
+            on_highlight = self._on_async_highlight,
+            flags = sublime.QuickPanelFlags.WANT_EVENT,
+            placeholder = "Loading..." if self._loading else ""
+        )
+
+    def _on_async_select(self, show_id, index, event):
+        """
+        Run when user applies an item (presses Enter) in an asynchronously populated panel
+
+        :param show_id: The id of the panel the selection was made in
+        :param index: The index selected (-1 if cancelling)
+        :param event: The event
+        """
+
+        if show_id != self._show_id:
+            # This panel was replaced by a newer one when a batch arrived
+            return
+
+        if index == -1:
+            self._cancel_population()
+            self.back()
+        elif index >= len(self.items):
+            # The placeholder item was selected, keep waiting
+            self._show()
+        else:
+            self._cancel_population()
+            self.enter(event)
+
+    def _on_async_highlight(self, index):
+        """
+        Run when user changes selection in an asynchronously populated panel
+
+        :param index: The selected index
+        """
+
+        # Ignore the placeholder item
+        if index < len(self.items):
+            self.select(index)
+
+class _SearchIndex():
+    """
+    An internal-only class keeping a flattened index of all items (leaves) of a menu tree
+    """
+
+    def __init__(self):
+        # The indexed items and their quick panel items per menu, in order of addition
+        self._entries = {}
+        self._items = None
+        self._panel_items = None
+
+    @property
+    def items(self):
+        """
+        Property reflecting all indexed items
+
+        :returns: The list of _QuickItem
+        """
+
+        if self._items is None:
+            self._items = [item for entries in self._entries.values() for item, _ in entries]
+        return self._items
+
+    @property
+    def panel_items(self):
+        """
+        Property reflecting the quick panel items of all indexed items, in the same order as items
+
+        :returns: The list of sublime.QuickPanelItem
+        """
+
+        if self._panel_items is None:
+            self._panel_items = [
+                panel_item for entries in self._entries.values() for _, panel_item in entries]
+        return self._panel_items
+
+    def add(self, menu, item):
+        """
+        Adds an item
+
+        :param menu: The QuickMenu the item belongs to
+        :param item: The _QuickItem
+        """
+
+        panel_item = sublime.QuickPanelItem(
+            trigger = item.title,
+            details = item.description,
+            annotation = menu._get_breadcrumb()
+        )
+        self._entries.setdefault(menu, []).append((item, panel_item))
+
+        # Extend the flattened lists in place if this is the last menu, otherwise rebuild them
+        if self._items is not None and self._panel_items is not None and \
+                next(reversed(self._entries)) is menu:
+            self._items.append(item)
+            self._panel_items.append(panel_item)
+        else:
+            self._items = None
+            self._panel_items = None
+
+    def add_tree(self, menu):
+        """
+        Adds all items of a menu and its sub menus
+
+        :param menu: The QuickMenu
+        """
+
+        stack = [menu]
+        while stack:
+            current = stack.pop()
+            for item in current.items:
+                if isinstance(item, QuickMenu):
+                    stack.append(item)
+                elif isinstance(current, _ProviderQuickMenu) and item is current._more_item:
+                    continue
+                else:
+                    self.add(current, item)
+
+    def remove_tree(self, menu):
+        """
+        Removes all items of a menu and its sub menus
+
+        :param menu: The QuickMenu
+        """
+
+        stack = [menu]
+        while stack:
+            current = stack.pop()
+            self._entries.pop(current, None)
+            stack.extend(item for item in current.items if isinstance(item, QuickMenu))
+
+        self._items = None
+        self._panel_items = None
+
 class _QuickItem(menu.MenuItem):
     """
     An internal-only class representing a menu item (action)
@@ -3,30 +3,155 @@ _logger = logging.getLogger(__name__)
 
 from . import log
 
-def init(local_settings_module, *, default_log_level = 'warning'):
+import sublime
+import os
+import json
+import time
+from contextlib import contextmanager
+
+# Number of inits and deinits kept in the startup profile file
+_MAX_PROFILES = 20
+
+# The durations in ms of the phases of the ongoing init or deinit
+_phases = {}
+
+def init(local_settings_module, *, default_log_level = 'warning', on_init = None, version = None,
+         deferred_settings = False):
     """
     Called whenever the plugin is loaded
 
+    The duration of each phase is recorded in the startup profile file, see get_profiles.
+
     :param local_settings_module: The plugin's settings module
     :param default_log_level: The default log level if not provided in settings file
+    :param on_init: Callback run to initialize the rest of the plugin, profiled as its own phase
+    :param version: The version of the plugin, recorded in the startup profile
+    :param deferred_settings: Whether to validate the settings in the background, see
+                              Settings.init
     """
 
+    _phases.clear()
+    start = time.perf_counter()
+
     _logger.debug("Plugin loaded.")
-    log.init(default_log_level)
-    local_settings_module.settings.init(default_log_level, log.on_log_lvl_change)
+    with phase('log'):
+        log.init(default_log_level)
+    with phase('settings'):
+        if deferred_settings:
+            local_settings_module.settings.init(default_log_level, log.on_log_lvl_change,
+                deferred = True)
+        else:
+            local_settings_module.settings.init(default_log_level, log.on_log_lvl_change)
+    if on_init is not None:
+        with phase('plugin'):
+            on_init()
 
-def deinit(local_settings_module):
+    _record('init', start, version)
+
+def deinit(local_settings_module, *, on_deinit = None, version = None):
     """
     Called whenever the plugin is unloaded
 
     :param local_settings_module: The plugin's settings module
+    :param on_deinit: Callback run to deinitialize the rest of the plugin, profiled as its own phase
+    :param version: The version of the plugin, recorded in the startup profile
     """
 
+    _phases.clear()
+    start = time.perf_counter()
+
     _logger.debug("Plugin unloaded.")
-    local_settings_module.settings.deinit()
-    log.deinit()
+    if on_deinit is not None:
+        with phase('plugin'):
+            on_deinit()
+    with phase('settings'):
+        local_settings_module.settings.deinit()
+    with phase('log'):
+        log.deinit()
     # Attempt to delete the logging.VERBOSE added by the logger. Otherwise reloading won't work
     try:
         delattr(logging, 'VERBOSE')
     except AttributeError as e:
         pass
+
+    _record('deinit', start, version)
+
+@contextmanager
+def phase(name):
+    """
+    Context manager profiling a phase of the ongoing init or deinit, e.g. a part of on_init
+
+    :param name: The name of the phase
+    """
+
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        _phases[name] = _phases.get(name, 0) + (time.perf_counter() - start) * 1000
+
+def get_profiles():
+    """
+    Gets the profiles of the last inits and deinits
+
+    :returns: A list of dictionaries of 'event' (init or deinit), 'time', 'sublime_version',
+              'version', 'total' and 'phases' (name -> ms), oldest first
+    """
+
+    try:
+        with open(_get_profile_path(), encoding = "utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return []
+
+def _record(event, start, version):
+    """
+    Logs the durations of the phases and stores them in the profile file (in the background)
+
+    :param event: 'init' or 'deinit'
+    :param start: The time (time.perf_counter) the event started
+    :param version: The version of the plugin
+    """
+
+    total = (time.perf_counter() - start) * 1000
+    phases = dict(_phases)
+    _logger.debug(f"Plugin {event} took {total:.1f} ms: " +
+        ", ".join(f"{name} {ms:.1f} ms" for name, ms in phases.items()))
+
+    profile = {
+        'event'             : event,
+        'time'              : time.strftime("%Y-%m-%dT%H:%M:%S"),
+        'sublime_version'   : sublime.version(),
+        'version'           : version,
+        'total'             : total,
+        'phases'            : phases
+    }
+
+    if event == 'init':
+        sublime.set_timeout_async(lambda : _store(profile), 0)
+    else:
+        # The plugin host may not run any more callbacks for this plugin
+        _store(profile)
+
+def _store(profile):
+    """
+    Appends a profile to the profile file, keeping the last _MAX_PROFILES
+
+    :param profile: The profile dictionary
+    """
+
+    profiles = get_profiles()[-(_MAX_PROFILES - 1):] + [profile]
+    path = _get_profile_path()
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok = True)
+        with open(path, "w", encoding = "utf-8") as f:
+            json.dump(profiles, f, indent = 4)
+    except OSError as e:
+        _logger.warning(f"Failed storing startup profile '{path}': {e}")
+
+def _get_profile_path():
+    """
+    Gets the path of the profile file
+    """
+
+    return os.path.join(sublime.cache_path(), __name__.split('.')[0], "startup_profile.json")
@@ -1,13 +1,46 @@
 import sublime
 import sublime_plugin
-import subprocess
+import copy
 import os
 import json
+import sys
+import threading
+from collections import namedtuple, OrderedDict
+
+# NOTE: Heavier modules (tempfile, shutil etc.) are imported by the functions
+# using them, to keep importing this module cheap
 
 import logging
 _logger = logging.getLogger(__name__)
 
-from .util import json as json_util
+PROJECT_EXTENSION = ".sublime-project"
+
+# Size of the chunks read when rewriting workspace files
+_REWRITE_CHUNK_SIZE = 1024 * 1024
+
+# Max number of parsed project files kept in memory
+_DATA_CACHE_SIZE = 32
+
+# Parsed project files, path -> ((mtime_ns, size), data), least recently used first
+_data_cache = OrderedDict()
+_data_cache_lock = threading.Lock()
+
+# Registry of the windows having a project open, project path -> set of window ids and back.
+# Built on first use and then kept current by ProjectRegistryListener. Without the listener it is
+# rebuilt on every use.
+_windows_by_project = {}
+_project_by_window = {}
+_registry_built = False
+_registry_listener_loaded = False
+
+# File indexes per project path, created by get_file_index
+_file_indexes = {}
+
+# Version of the project index cache file format. Bump when changing it.
+_PROJECT_INDEX_VERSION = 1
+
+# A project found by the ProjectIndex
+ProjectInfo = namedtuple('ProjectInfo', ['path', 'name', 'mtime', 'folders'])
 
 def get_name(path = None):
     """
@@ -25,6 +58,95 @@ def get_name(path = None):
 
     return os.path.splitext(os.path.basename(path))[0]
 
+def get_data(path = None):
+    """
+    Gets the parsed contents of a sublime-project or sublime-workspace file
+
+    The result for a sublime-project file is cached until the file's mtime or size changes, so
+    repeated calls only cost a stat call. It is shared between callers and must not be modified.
+    Workspace files are parsed on every call, as they can be tens of MB.
+
+    :param path: The file or None if referring to the project of the current window
+    :returns: The parsed contents, None if no project or file not found
+    :raises ValueError: Raised if the file is not valid JSON
+    """
+
+    if path is None:
+        path = sublime.active_window().project_file_name()
+        if not path:
+            return None
+
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    stamp = (st.st_mtime_ns, st.st_size)
+
+    with _data_cache_lock:
+        cached = _data_cache.get(path)
+        if cached is not None and cached[0] == stamp:
+            _data_cache.move_to_end(path)
+            return cached[1]
+
+    _logger.debug(f"Parsing '{path}'.")
+    try:
+        with open(path, encoding = "utf-8") as f:
+            data = sublime.decode_value(f.read())
+    except FileNotFoundError:
+        return None
+
+    if not path.endswith(PROJECT_EXTENSION):
+        return data
+
+    with _data_cache_lock:
+        _data_cache[path] = (stamp, data)
+        _data_cache.move_to_end(path)
+        while len(_data_cache) > _DATA_CACHE_SIZE:
+            _data_cache.popitem(last = False)
+
+    return data
+
+def get_folders(path = None):
+    """
+    Gets the absolute paths of the folders of a project
+
+    :param path: Sublime-project file or None if referring to open project in current window
+    :returns: The list of folder paths, empty if no project or file not found
+    """
+
+    if path is None:
+        path = sublime.active_window().project_file_name()
+        if not path:
+            return []
+
+    return _get_folder_paths(path, get_data(path))
+
+def get_settings(path = None):
+    """
+    Gets the settings of a project
+
+    :param path: Sublime-project file or None if referring to open project in current window
+    :returns: The settings dictionary (a copy, free to modify), empty if no project, file not
+              found or no settings
+    """
+
+    data = get_data(path)
+    settings = data.get('settings') if isinstance(data, dict) else None
+    return copy.deepcopy(settings) if isinstance(settings, dict) else {}
+
+def get_build_systems(path = None):
+    """
+    Gets the build systems of a project
+
+    :param path: Sublime-project file or None if referring to open project in current window
+    :returns: The list of build system dictionaries (a copy, free to modify), empty if no
+              project, file not found or no build systems
+    """
+
+    data = get_data(path)
+    build_systems = data.get('build_systems') if isinstance(data, dict) else None
+    return copy.deepcopy(build_systems) if isinstance(build_systems, list) else []
+
 def rename(name):
     """
     Renames the project in the current window
@@ -55,17 +177,23 @@ def rename(name):
     _logger.debug(f"Closing project '{current_name}'.")
     sublime.active_window().run_command('close_workspace')
 
-    # Rename files
+    # Rename files. The workspace is written to its new name with all references to the old
+    # project file replaced, before the old one is removed.
     _logger.debug(f"Renaming project files.")
     new_ws_path = os.path.join(ws_dir, f"{name}.sublime-workspace")
-    os.rename(ws_path, new_ws_path)
+    old_prj_name = f"{current_name}.sublime-project"
+    new_prj_name = f"{name}.sublime-project"
+    if _is_same_file(ws_path, new_ws_path):
+        # A case-only rename on a case-insensitive file system. Rewrite in place, as removing the
+        # old file would remove the new one.
+        _rewrite_json_string_value(ws_path, ws_path, old_prj_name, new_prj_name)
+        os.rename(ws_path, new_ws_path)
+    else:
+        _rewrite_json_string_value(ws_path, new_ws_path, old_prj_name, new_prj_name)
+        os.remove(ws_path)
     new_prj_path = os.path.join(prj_dir, f"{name}.sublime-project")
     os.rename(prj_path, new_prj_path)
 
-    # Replace all references to the old project file in the workspace file
-    json_util.replace_value_in_file(
-        new_ws_path, f"{current_name}.sublime-project", f"{name}.sublime-project")
-
     # Open new project
     open_project(new_prj_path)
 
@@ -96,13 +224,62 @@ def switch(path):
 
     # Close all windows belonging to the current project, if any
     if project_path is not None:
-        for w in list(sublime.windows()):
-            if w.project_file_name() == project_path:
-                w.run_command("close_window")
+        for w in get_windows(project_path):
+            w.run_command("close_window")
 
     # Open the new project
     sublime.active_window().run_command("open_project_or_workspace", {"file": path})
 
+def get_windows(path):
+    """
+    Gets the windows having a project open
+
+    :param path: The sublime-project file
+    :returns: The list of windows
+    """
+
+    path = os.path.abspath(path)
+    _ensure_registry()
+    windows = [sublime.Window(window_id) for window_id in _windows_by_project.get(path, ())]
+    if any(not w.is_valid() or _get_window_project_path(w) != path for w in windows):
+        # A change was missed, so rebuild
+        _ensure_registry(rebuild = True)
+        windows = [sublime.Window(window_id) for window_id in _windows_by_project.get(path, ())]
+    return [w for w in windows if w.is_valid()]
+
+def get_project_path(window):
+    """
+    Gets the project open in a window
+
+    :param window: The window
+    :returns: The sublime-project file, None if no project
+    """
+
+    _ensure_registry()
+    return _project_by_window.get(window.id())
+
+def get_file_index(path = None):
+    """
+    Gets the index of the files in the folders of a project. It is created, and refreshed in the
+    background, on first request.
+
+    :param path: Sublime-project file or None if referring to open project in current window
+    :returns: The FileIndex, None if no project
+    """
+
+    if path is None:
+        path = sublime.active_window().project_file_name()
+        if not path:
+            return None
+    path = os.path.abspath(path)
+
+    index = _file_indexes.get(path)
+    if index is None:
+        index = FileIndex(path)
+        _file_indexes[path] = index
+        index.refresh_async()
+    return index
+
 def open_project(path):
     """
     Opens a project of a certain path
@@ -128,3 +305,665 @@ def create(path):
     # Write the project file
     with open(path, "w", encoding="utf-8") as f:
         json.dump(data, f, indent=4)
+
+class ProjectRegistryListener(sublime_plugin.EventListener):
+    """
+    Keeps the window-to-project registry current. Import it into a plugin module for Sublime to
+    load it.
+    """
+
+    def __init__(self):
+        global _registry_listener_loaded
+        super().__init__()
+        _registry_listener_loaded = True
+
+    def on_new_window(self, window):
+        _register_window(window)
+
+    def on_pre_close_window(self, window):
+        _unregister_window(window.id())
+
+    def on_new_project(self, window):
+        _register_window(window)
+
+    def on_load_project(self, window):
+        _register_window(window)
+
+    def on_post_save_project(self, window):
+        # The project may have been saved under a new name
+        _register_window(window)
+
+    def on_pre_close_project(self, window):
+        _unregister_window(window.id())
+
+def _ensure_registry(rebuild = False):
+    """
+    Builds the window-to-project registry from all open windows, unless already built and kept
+    current by ProjectRegistryListener
+
+    :param rebuild: Whether to rebuild it even if kept current
+    """
+
+    global _registry_built
+    if _registry_built and _registry_listener_loaded and not rebuild:
+        return
+
+    _logger.debug("Building window-to-project registry.")
+    _windows_by_project.clear()
+    _project_by_window.clear()
+    for window in sublime.windows():
+        _register_window(window)
+    _registry_built = True
+
+def _register_window(window):
+    """
+    Adds or updates a window in the window-to-project registry
+
+    :param window: The window
+    """
+
+    window_id = window.id()
+    _unregister_window(window_id)
+
+    path = _get_window_project_path(window)
+    if path:
+        _project_by_window[window_id] = path
+        _windows_by_project.setdefault(path, set()).add(window_id)
+
+def _get_window_project_path(window):
+    """
+    Gets the absolute path of the project open in a window
+
+    :param window: The window
+    :returns: The sublime-project file, None if no project
+    """
+
+    path = window.project_file_name()
+    return os.path.abspath(path) if path else None
+
+def _unregister_window(window_id):
+    """
+    Removes a window from the window-to-project registry
+
+    :param window_id: The id of the window
+    """
+
+    path = _project_by_window.pop(window_id, None)
+    if path is not None:
+        window_ids = _windows_by_project[path]
+        window_ids.discard(window_id)
+        if not window_ids:
+            del _windows_by_project[path]
+
+def _get_folder_paths(path, data):
+    """
+    Gets the absolute paths of the folders in parsed project data
+
+    :param path: The sublime-project file the data was read from
+    :param data: The parsed project data
+    :returns: The list of folder paths
+    """
+
+    if not isinstance(data, dict):
+        return []
+
+    prj_dir = os.path.dirname(path)
+    folders = []
+    for folder in data.get('folders', []):
+        folder_path = folder.get('path') if isinstance(folder, dict) else None
+        if isinstance(folder_path, str):
+            folders.append(os.path.normpath(os.path.join(prj_dir, os.path.expanduser(folder_path))))
+    return folders
+
+def _is_same_file(path, other_path):
+    """
+    Determines if two paths refer to the same file, e.g. when only differing in case on a
+    case-insensitive file system
+
+    :param path: The path of an existing file
+    :param other_path: The other path, which may not exist
+    """
+
+    try:
+        return os.path.samefile(path, other_path)
+    except OSError:
+        return os.path.normcase(os.path.abspath(path)) == os.path.normcase(os.path.abspath(other_path))
+
+def _rewrite_json_string_value(src_path, dst_path, old, new):
+    """
+    Copies a JSON file, replacing all string values equal to one string with another
+
+    The file is streamed in chunks, so it is never held in memory as a whole, into a temporary
+    file in the destination directory which then replaces the destination. Thus the destination
+    is never left half-written.
+
+    :param src_path: The file to read
+    :param dst_path: The file to write (may be the same as src_path)
+    :param old: The string value to replace
+    :param new: The string value to replace it with
+    :returns: The number of replacements
+    """
+
+    import shutil
+    import tempfile
+
+    old_bytes = json.dumps(old, ensure_ascii = False).encode('utf-8')
+    new_bytes = json.dumps(new, ensure_ascii = False).encode('utf-8')
+
+    fd, tmp_path = tempfile.mkstemp(
+        dir = os.path.dirname(dst_path), prefix = f".{os.path.basename(dst_path)}.", suffix = ".tmp")
+    count = 0
+    try:
+        with open(src_path, "rb") as src, os.fdopen(fd, "wb") as dst:
+            buf = b""
+            # The last byte written, to detect an escaped quote starting a match
+            prev = b""
+            while True:
+                chunk = src.read(_REWRITE_CHUNK_SIZE)
+                buf += chunk
+                start = 0
+                while True:
+                    i = buf.find(old_bytes, start)
+                    if i == -1:
+                        break
+                    dst.write(buf[start:i])
+                    preceding = buf[i - 1:i] if i > 0 else prev
+                    if preceding == b"\\":
+                        # The quote is escaped, so this is part of a longer string
+                        dst.write(old_bytes)
+                    else:
+                        dst.write(new_bytes)
+                        count += 1
+                    start = i + len(old_bytes)
+
+                # Keep a tail which may be the start of a match continuing in the next chunk
+                keep = len(old_bytes) - 1 if chunk else 0
+                cut = max(start, len(buf) - keep)
+                dst.write(buf[start:cut])
+                if cut > 0:
+                    prev = buf[cut - 1:cut]
+                buf = buf[cut:]
+
+                if not chunk:
+                    break
+
+            dst.flush()
+            os.fsync(dst.fileno())
+
+        shutil.copymode(src_path, tmp_path)
+        os.replace(tmp_path, dst_path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+    _logger.debug(f"Replaced {count} occurrences of '{old}' writing '{dst_path}'.")
+    return count
+
+class ProjectIndex():
+    """
+    An index of the sublime-project files found under a set of root directories
+
+    The result is persisted to a cache file. On refresh only directories whose mtime changed are
+    listed again, and only project files whose mtime changed are parsed again.
+    """
+
+    def __init__(self, roots, cache_path = None, *, max_depth = 3):
+        """
+        Initializes the index
+
+        :param roots: The directories to search for projects in
+        :param cache_path: The file to persist the index to, or None for a default in the Sublime
+                           cache directory
+        :param max_depth: Max number of directory levels below a root to search
+        """
+
+        self._roots = [os.path.abspath(os.path.expanduser(root)) for root in roots]
+        if cache_path is None:
+            cache_path = os.path.join(
+                sublime.cache_path(), __name__.split('.')[0], "project_index.json")
+        self._cache_path = cache_path
+        self._max_depth = max_depth
+
+        self._lock = threading.Lock()
+        # The job of the running refresh_async
+        self._job = None
+        # Directory path -> {'mtime', 'subdirs', 'projects'}
+        self._dirs = {}
+        # Project path -> ProjectInfo
+        self._projects = {}
+
+    @property
+    def projects(self):
+        """
+        Property reflecting the indexed projects
+
+        :returns: A list of ProjectInfo sorted by name
+        """
+
+        with self._lock:
+            projects = list(self._projects.values())
+        return sorted(projects, key = lambda p : p.name.lower())
+
+    def load(self):
+        """
+        Loads the index from the cache file, if any
+        """
+
+        try:
+            with open(self._cache_path, encoding = "utf-8") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            _logger.warning(f"Failed loading project index '{self._cache_path}': {e}")
+            return
+
+        if data.get('version') != _PROJECT_INDEX_VERSION or data.get('roots') != self._roots:
+            _logger.debug(f"Ignoring outdated project index '{self._cache_path}'.")
+            return
+
+        with self._lock:
+            self._dirs = data['dirs']
+            self._projects = {path : ProjectInfo(path, *info) for path, info in data['projects'].items()}
+        _logger.debug(f"Loaded {len(self._projects)} projects from '{self._cache_path}'.")
+
+    def save(self):
+        """
+        Writes the index to the cache file
+        """
+
+        with self._lock:
+            data = {
+                'version'   : _PROJECT_INDEX_VERSION,
+                'roots'     : self._roots,
+                'dirs'      : self._dirs,
+                'projects'  : {path : list(info[1:]) for path, info in self._projects.items()}
+            }
+
+        os.makedirs(os.path.dirname(self._cache_path), exist_ok = True)
+        tmp_path = f"{self._cache_path}.tmp"
+        with open(tmp_path, "w", encoding = "utf-8") as f:
+            json.dump(data, f)
+        os.replace(tmp_path, self._cache_path)
+
+    def refresh(self, token = None):
+        """
+        Rescans the root directories and saves the result to the cache file
+
+        :param token: The jobs.CancellationToken checked between directory levels, or None
+        :returns: A list of ProjectInfo sorted by name
+        :raises jobs.JobCancelled: Raised if cancelled, keeping the previous result
+        """
+
+        with self._lock:
+            old_dirs = self._dirs
+            old_projects = self._projects
+
+        dirs = {}
+        projects = {}
+        frontier = [root for root in self._roots if os.path.isdir(root)]
+        for _ in range(self._max_depth + 1):
+            if not frontier:
+                break
+            if token is not None:
+                token.raise_if_cancelled()
+
+            results = [self._scan_dir(path, old_dirs) for path in frontier]
+            frontier = []
+            for path, entry in results:
+                if entry is None:
+                    continue
+                dirs[path] = entry
+                frontier.extend(entry['subdirs'])
+
+        if token is not None:
+            token.raise_if_cancelled()
+        for entry in dirs.values():
+            for path in entry['projects']:
+                info = self._read_project(path, old_projects.get(path))
+                if info is not None:
+                    projects[info.path] = info
+
+        with self._lock:
+            self._dirs = dirs
+            self._projects = projects
+        _logger.debug(f"Found {len(projects)} projects in {len(dirs)} directories.")
+
+        try:
+            self.save()
+        except OSError as e:
+            _logger.warning(f"Failed saving project index '{self._cache_path}': {e}")
+
+        return self.projects
+
+    def refresh_async(self, on_done = None):
+        """
+        Rescans the root directories in the background, as a low priority job of the shared job
+        queue. A refresh still running is cancelled.
+
+        :param on_done: Callback run on the main thread with the list of ProjectInfo when done
+        :returns: The jobs.Job
+        """
+
+        from . import jobs
+
+        if self._job is not None:
+            self._job.cancel()
+        self._job = jobs.get_queue().submit(self.refresh,
+            name = "refresh project index",
+            priority = jobs.PRIORITY_LOW,
+            on_done = on_done)
+        return self._job
+
+    def _scan_dir(self, path, old_dirs):
+        """
+        Lists a directory, unless it is unchanged since the previous scan
+
+        :param path: The directory
+        :param old_dirs: The directory entries of the previous scan
+        :returns: A tuple of the path and its entry, or None if it could not be read
+        """
+
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except OSError:
+            return path, None
+
+        old = old_dirs.get(path)
+        if old is not None and old['mtime'] == mtime:
+            return path, old
+
+        subdirs = []
+        projects = []
+        try:
+            with os.scandir(path) as it:
+                for entry in it:
+                    if entry.name.startswith('.'):
+                        continue
+                    try:
+                        if entry.is_dir(follow_symlinks = False):
+                            subdirs.append(entry.path)
+                        elif entry.name.endswith(PROJECT_EXTENSION) and entry.is_file():
+                            projects.append(entry.path)
+                    except OSError:
+                        continue
+        except OSError as e:
+            _logger.debug(f"Failed scanning '{path}': {e}")
+            return path, None
+
+        return path, {'mtime' : mtime, 'subdirs' : subdirs, 'projects' : projects}
+
+    def _read_project(self, path, old):
+        """
+        Reads a project file, unless it is unchanged since the previous scan
+
+        :param path: The project file
+        :param old: The ProjectInfo of the previous scan, or None
+        :returns: The ProjectInfo, or None if it could not be read
+        """
+
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except OSError:
+            return None
+
+        if old is not None and old.mtime == mtime:
+            return old
+
+        try:
+            with open(path, encoding = "utf-8") as f:
+                folders = _get_folder_paths(path, sublime.decode_value(f.read()))
+        except (OSError, ValueError) as e:
+            _logger.debug(f"Failed reading project '{path}': {e}")
+            folders = []
+
+        return ProjectInfo(path, get_name(path), mtime, folders)
+
+class FileIndex():
+    """
+    An index of the files in the folders of a project, respecting the global folder and file
+    exclude patterns and those of each folder
+
+    Directory paths are interned and their files are stored as tuples of base names. On refresh
+    only directories whose mtime changed are listed again.
+    """
+
+    def __init__(self, project_path):
+        """
+        Initializes the index. It is empty until refreshed.
+
+        :param project_path: The sublime-project file
+        """
+
+        self._project_path = project_path
+
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        # The job of the running refresh_async
+        self._job = None
+        # Directory path -> (mtime_ns, subdirectory paths, file base names)
+        self._dirs = {}
+        # The folders of the project and global exclude patterns when last scanned
+        self._folders = None
+
+    def __len__(self):
+        with self._lock:
+            dirs = self._dirs
+        return sum(len(entry[2]) for entry in dirs.values())
+
+    def __iter__(self):
+        return self.files()
+
+    def files(self):
+        """
+        Iterates the indexed files
+
+        :returns: A generator of absolute file paths
+        """
+
+        with self._lock:
+            dirs = self._dirs
+        for dir_path, entry in dirs.items():
+            for name in entry[2]:
+                yield os.path.join(dir_path, name)
+
+    def find(self, text, limit = None):
+        """
+        Finds files whose base name contains a text, case insensitive
+
+        :param text: The text to search for
+        :param limit: Max number of files to return, or None for all
+        :returns: The list of absolute file paths
+        """
+
+        text = text.lower()
+        found = []
+        with self._lock:
+            dirs = self._dirs
+        for dir_path, entry in dirs.items():
+            for name in entry[2]:
+                if text in name.lower():
+                    found.append(os.path.join(dir_path, name))
+                    if limit is not None and len(found) >= limit:
+                        return found
+        return found
+
+    def refresh(self, token = None):
+        """
+        Rescans the folders of the project
+
+        :param token: The jobs.CancellationToken checked between directory levels, or None
+        :raises jobs.JobCancelled: Raised if cancelled, keeping the previous result
+        """
+
+        with self._refresh_lock:
+            with self._lock:
+                old_dirs = self._dirs
+
+            data = get_data(self._project_path)
+            folders = data.get('folders', []) if isinstance(data, dict) else []
+            preferences = sublime.load_settings("Preferences.sublime-settings")
+            global_folder_exclude_patterns = preferences.get('folder_exclude_patterns', [])
+            global_file_exclude_patterns = preferences.get('file_exclude_patterns', [])
+            config = (folders, global_folder_exclude_patterns, global_file_exclude_patterns)
+            if config != self._folders:
+                # Paths or exclude patterns may have changed, so the listings cannot be reused
+                old_dirs = {}
+
+            prj_dir = os.path.dirname(self._project_path)
+            dirs = {}
+            # Identities of the scanned directories, so that symlinks to ancestors are not
+            # followed forever
+            visited = set()
+            for folder in folders:
+                if not isinstance(folder, dict) or not isinstance(folder.get('path'), str):
+                    continue
+
+                root = os.path.normpath(os.path.join(prj_dir, os.path.expanduser(folder['path'])))
+                scanner = _FolderScanner(root,
+                    global_folder_exclude_patterns + folder.get('folder_exclude_patterns', []),
+                    global_file_exclude_patterns + folder.get('file_exclude_patterns', []),
+                    folder.get('follow_symlinks', False))
+
+                frontier = [root] if os.path.isdir(root) else []
+                while frontier:
+                    if token is not None:
+                        token.raise_if_cancelled()
+
+                    results = [scanner.scan(path, old_dirs) for path in frontier]
+                    frontier = []
+                    for path, identity, entry in results:
+                        if entry is not None and path not in dirs and identity not in visited:
+                            visited.add(identity)
+                            dirs[path] = entry
+                            frontier.extend(entry[1])
+
+            with self._lock:
+                self._dirs = dirs
+            self._folders = config
+
+        _logger.debug(f"Indexed {len(self)} files in {len(dirs)} directories of project "
+            f"'{get_name(self._project_path)}'.")
+
+    def refresh_async(self, on_done = None):
+        """
+        Rescans the folders of the project in the background, as a low priority job of the shared
+        job queue. A refresh still running is cancelled.
+
+        :param on_done: Callback run on the main thread when done
+        :returns: The jobs.Job
+        """
+
+        from . import jobs
+
+        if self._job is not None:
+            self._job.cancel()
+        self._job = jobs.get_queue().submit(self.refresh,
+            name = f"refresh file index of '{get_name(self._project_path)}'",
+            priority = jobs.PRIORITY_LOW,
+            on_done = (lambda result : on_done()) if on_done is not None else None)
+        return self._job
+
+class _FolderScanner():
+    """
+    An internal-only class listing the directories of a project folder
+    """
+
+    def __init__(self, root, folder_exclude_patterns, file_exclude_patterns, follow_symlinks):
+        """
+        Initializes the scanner
+
+        :param root: The folder path
+        :param folder_exclude_patterns: Patterns of directories to exclude
+        :param file_exclude_patterns: Patterns of files to exclude
+        :param follow_symlinks: Whether to descend into symlinked directories
+        """
+
+        self._root = root
+        self._folder_exclude_patterns = self._compile(folder_exclude_patterns)
+        self._file_exclude_patterns = self._compile(file_exclude_patterns)
+        self._follow_symlinks = follow_symlinks
+
+    def scan(self, path, old_dirs):
+        """
+        Lists a directory, unless it is unchanged since the previous scan
+
+        :param path: The directory
+        :param old_dirs: The directory entries of the previous scan
+        :returns: A tuple of the path, the identity of the directory (the same for all paths
+                  leading to it through symlinks) and its entry, or None if it could not be read
+        """
+
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return path, None, None
+
+        mtime = stat.st_mtime_ns
+        # Some file systems on Windows report no inode
+        identity = (stat.st_dev, stat.st_ino) if stat.st_ino else os.path.realpath(path)
+
+        old = old_dirs.get(path)
+        if old is not None and old[0] == mtime:
+            return path, identity, old
+
+        subdirs = []
+        files = []
+        try:
+            with os.scandir(path) as it:
+                for entry in it:
+                    try:
+                        if entry.is_dir(follow_symlinks = self._follow_symlinks):
+                            if not self._is_excluded(entry, self._folder_exclude_patterns):
+                                subdirs.append(sys.intern(entry.path))
+                        elif entry.is_dir():
+                            # A symlinked directory not to be followed, which is no file either
+                            continue
+                        elif not self._is_excluded(entry, self._file_exclude_patterns):
+                            files.append(entry.name)
+                    except OSError:
+                        continue
+        except OSError as e:
+            _logger.debug(f"Failed scanning '{path}': {e}")
+            return path, identity, None
+
+        return sys.intern(path), identity, (mtime, tuple(subdirs), tuple(files))
+
+    def _is_excluded(self, entry, patterns):
+        """
+        Determines if a directory entry matches any of a list of exclude patterns. Patterns
+        containing a slash are matched against the path relative to the folder.
+
+        :param entry: The os.DirEntry
+        :param patterns: The compiled exclude patterns
+        :returns: True if excluded
+        """
+
+        for is_path_pattern, regex in patterns:
+            if is_path_pattern:
+                rel_path = os.path.relpath(entry.path, self._root).replace(os.sep, '/')
+                if regex.match(rel_path):
+                    return True
+            elif regex.match(entry.name):
+                return True
+        return False
+
+    @staticmethod
+    def _compile(patterns):
+        """
+        Compiles exclude patterns
+
+        :param patterns: The glob patterns
+        :returns: A list of tuples of whether to match the relative path, and the compiled pattern
+        """
+
+        import fnmatch
+        import re
+
+        # Match case insensitive where the file system is (like fnmatch.fnmatch)
+        flags = re.IGNORECASE if os.path.normcase('A') == 'a' else 0
+        return [('/' in pattern, re.compile(fnmatch.translate(pattern.lstrip('/')), flags))
+            for pattern in patterns]
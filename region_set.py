@@ -0,0 +1,237 @@
+"""
+Module handling sets of regions
+"""
+
+import logging
+
+# Local logger
+_logger = logging.getLogger(__name__)
+
+import sublime
+
+from array import array
+from bisect import bisect_left, bisect_right
+from typing import Iterable, Iterator
+
+class RegionSet():
+    """
+    A sorted set of non-overlapping regions, stored as two arrays of begin and end points.
+    Overlapping or touching regions are merged when added.
+    """
+
+    def __init__(self):
+        """
+        Initializes an empty set
+        """
+
+        self._begins = array('q')
+        self._ends = array('q')
+
+    @classmethod
+    def from_regions(cls, regions : Iterable[sublime.Region]) -> 'RegionSet':
+        """
+        Creates a set from regions
+
+        :param regions: The regions, in any order
+        """
+
+        return cls._from_sorted_pairs(sorted((r.begin(), r.end()) for r in regions))
+
+    @classmethod
+    def from_selection(cls, view : sublime.View) -> 'RegionSet':
+        """
+        Creates a set from the selection of a view
+
+        :param view: The applicable view
+        """
+
+        # The selection is already sorted
+        return cls._from_sorted_pairs((r.begin(), r.end()) for r in view.sel())
+
+    @classmethod
+    def _from_sorted_pairs(cls, pairs : Iterable) -> 'RegionSet':
+        """
+        Creates a set from (begin, end) pairs sorted on begin, merging overlaps
+
+        :param pairs: The sorted pairs
+        """
+
+        region_set = cls()
+        begins = region_set._begins
+        ends = region_set._ends
+        for begin, end in pairs:
+            if ends and begin <= ends[-1]:
+                if end > ends[-1]:
+                    ends[-1] = end
+            else:
+                begins.append(begin)
+                ends.append(end)
+        return region_set
+
+    def __len__(self) -> int:
+        return len(self._begins)
+
+    def __iter__(self) -> Iterator[sublime.Region]:
+        return map(sublime.Region, self._begins, self._ends)
+
+    def __contains__(self, point : int) -> bool:
+        return self.contains(point)
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, RegionSet):
+            return NotImplemented
+        return self._begins == other._begins and self._ends == other._ends
+
+    def __repr__(self) -> str:
+        return f"RegionSet({list(zip(self._begins, self._ends))})"
+
+    def to_regions(self) -> list:
+        """
+        Gets the regions of the set
+
+        :returns: The list of regions, sorted
+        """
+
+        return list(self)
+
+    def to_selection(self, view : sublime.View) -> None:
+        """
+        Replaces the selection of a view with the regions of the set
+
+        :param view: The applicable view
+        """
+
+        sel = view.sel()
+        sel.clear()
+        sel.add_all(self)
+
+    def copy(self) -> 'RegionSet':
+        """
+        Gets a copy of the set
+        """
+
+        region_set = RegionSet()
+        region_set._begins = array('q', self._begins)
+        region_set._ends = array('q', self._ends)
+        return region_set
+
+    def add(self, region : sublime.Region) -> None:
+        """
+        Adds a region, merging it with the regions it overlaps or touches
+
+        :param region: The region to add
+        """
+
+        self.add_range(region.begin(), region.end())
+
+    def add_range(self, begin : int, end : int) -> None:
+        """
+        Adds a range, merging it with the regions it overlaps or touches
+
+        :param begin: The begin point
+        :param end: The end point
+        """
+
+        # The regions [i, j) overlap or touch the range
+        i = bisect_left(self._ends, begin)
+        j = bisect_right(self._begins, end)
+        if i < j:
+            begin = min(begin, self._begins[i])
+            end = max(end, self._ends[j - 1])
+        self._begins[i:j] = array('q', (begin,))
+        self._ends[i:j] = array('q', (end,))
+
+    def contains(self, point : int) -> bool:
+        """
+        Determines if a point is within any region (including its begin and end)
+
+        :param point: The point of interest
+        """
+
+        k = bisect_right(self._begins, point) - 1
+        return k >= 0 and point <= self._ends[k]
+
+    def overlapping(self, region : sublime.Region) -> 'RegionSet':
+        """
+        Gets the regions overlapping or touching a region, e.g. the visible region of a view
+
+        :param region: The region of interest
+        """
+
+        i = bisect_left(self._ends, region.begin())
+        j = bisect_right(self._begins, region.end())
+        region_set = RegionSet()
+        region_set._begins = self._begins[i:j]
+        region_set._ends = self._ends[i:j]
+        return region_set
+
+    def union(self, other : 'RegionSet') -> 'RegionSet':
+        """
+        Gets the union with another set
+
+        :param other: The other set
+        """
+
+        return RegionSet._from_sorted_pairs(sorted(
+            zip(self._begins + other._begins, self._ends + other._ends)))
+
+    def intersect(self, other : 'RegionSet') -> 'RegionSet':
+        """
+        Gets the intersection with another set. Regions only touching are not included.
+
+        :param other: The other set
+        """
+
+        result = RegionSet()
+        i = j = 0
+        while i < len(self._begins) and j < len(other._begins):
+            begin = max(self._begins[i], other._begins[j])
+            end = min(self._ends[i], other._ends[j])
+            # Empty regions are kept if within the other region
+            is_empty = self._begins[i] == self._ends[i] or other._begins[j] == other._ends[j]
+            if begin < end or (begin == end and is_empty):
+                result._begins.append(begin)
+                result._ends.append(end)
+
+            if self._ends[i] < other._ends[j]:
+                i += 1
+            else:
+                j += 1
+        return result
+
+    def subtract(self, other : 'RegionSet') -> 'RegionSet':
+        """
+        Gets the regions of this set with the regions of another set removed. Empty regions are
+        removed if within a region of the other set, and don't split the regions of this set.
+
+        :param other: The other set
+        """
+
+        result = RegionSet()
+        j = 0
+        for begin, end in zip(self._begins, self._ends):
+            if begin == end:
+                if not other.contains(begin):
+                    result._begins.append(begin)
+                    result._ends.append(end)
+                continue
+
+            # Skip the regions of the other set ending before this region
+            while j < len(other._begins) and other._ends[j] <= begin:
+                j += 1
+
+            k = j
+            while k < len(other._begins) and other._begins[k] < end:
+                if other._begins[k] == other._ends[k]:
+                    k += 1
+                    continue
+                if other._begins[k] > begin:
+                    result._begins.append(begin)
+                    result._ends.append(other._begins[k])
+                begin = max(begin, other._ends[k])
+                k += 1
+
+            if begin < end:
+                result._begins.append(begin)
+                result._ends.append(end)
+        return result
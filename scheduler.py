@@ -0,0 +1,214 @@
+"""
+Module handling rate-limited scheduling of work, e.g. triggered by view events
+"""
+
+import logging
+
+# Local logger
+_logger = logging.getLogger(__name__)
+
+import sublime
+import threading
+import time
+
+from typing import Callable, Dict, Hashable
+
+# Time in ms a job may run after it was due before counted as late
+LATE_THRESHOLD = 50
+
+class _Job():
+    """
+    An internal-only class representing a scheduled job
+    """
+
+    def __init__(self, generation, callback, args, due, throttled):
+        """
+        Initializes the job
+
+        :param generation: The generation token of the job
+        :param callback: The callback to run
+        :param args: The arguments of the callback
+        :param due: The time (time.monotonic) the job is due
+        :param throttled: Whether the time of running it must be remembered for throttling
+        """
+
+        self.generation = generation
+        self.callback = callback
+        self.args = args
+        self.due = due
+        self.throttled = throttled
+
+class Scheduler():
+    """
+    Schedules callbacks per key, so that only one job per key is pending at a time. A job
+    replaced by a newer one for the same key is dropped when its timeout fires, through its
+    generation token.
+    """
+
+    def __init__(self, *, asynchronous : bool = False):
+        """
+        Initializes the scheduler
+
+        :param asynchronous: Whether to run the callbacks through set_timeout_async instead of on
+                             the main thread
+        """
+
+        self._set_timeout = sublime.set_timeout_async if asynchronous else sublime.set_timeout
+        self._lock = threading.Lock()
+        self._generation = 0
+        # Key -> the pending _Job
+        self._jobs = {}
+        # Key -> time (time.monotonic) a throttled job was last run
+        self._last_run = {}
+        self._metrics = {'scheduled' : 0, 'coalesced' : 0, 'executed' : 0, 'late' : 0}
+
+    @property
+    def metrics(self) -> Dict[str, int]:
+        """
+        Property reflecting the number of jobs scheduled, coalesced into a pending job (or
+        replacing it), executed, and executed later than LATE_THRESHOLD after being due
+        """
+
+        with self._lock:
+            return dict(self._metrics)
+
+    def is_pending(self, key : Hashable) -> bool:
+        """
+        Determines if a job is pending for a key
+
+        :param key: The key of the job
+        """
+
+        with self._lock:
+            return key in self._jobs
+
+    def debounce(self, key : Hashable, delay : int, callback : Callable, *args) -> None:
+        """
+        Runs a callback once no further jobs have been scheduled for the key for a while. Any
+        pending job for the key is dropped.
+
+        :param key: The key of the job
+        :param delay: Time in ms to wait
+        :param callback: The callback to run
+        :param args: The arguments of the callback
+        """
+
+        with self._lock:
+            if key in self._jobs:
+                self._metrics['coalesced'] += 1
+            job = self._new_job(callback, args, delay)
+            self._jobs[key] = job
+
+        self._set_timeout(lambda : self._run(key, job.generation), delay)
+
+    def throttle(self, key : Hashable, interval : int, callback : Callable, *args) -> None:
+        """
+        Runs a callback at most once per interval for the key. Jobs scheduled while one is pending
+        replace its callback and arguments (latest wins).
+
+        :param key: The key of the job
+        :param interval: Min time in ms between runs
+        :param callback: The callback to run
+        :param args: The arguments of the callback
+        """
+
+        with self._lock:
+            job = self._jobs.get(key)
+            if job is not None:
+                self._metrics['coalesced'] += 1
+                job.callback = callback
+                job.args = args
+                return
+
+            last_run = self._last_run.get(key)
+            if last_run is None:
+                delay = 0
+            else:
+                delay = max(0, int((last_run - time.monotonic()) * 1000) + interval)
+            job = self._new_job(callback, args, delay, throttled = True)
+            self._jobs[key] = job
+
+        self._set_timeout(lambda : self._run(key, job.generation), delay)
+
+    def coalesce(self, key : Hashable, callback : Callable, *args) -> None:
+        """
+        Runs a callback as soon as possible. Jobs scheduled while one is pending replace its
+        callback and arguments (latest wins).
+
+        :param key: The key of the job
+        :param callback: The callback to run
+        :param args: The arguments of the callback
+        """
+
+        with self._lock:
+            job = self._jobs.get(key)
+            if job is not None:
+                self._metrics['coalesced'] += 1
+                job.callback = callback
+                job.args = args
+                return
+
+            job = self._new_job(callback, args, 0)
+            self._jobs[key] = job
+
+        self._set_timeout(lambda : self._run(key, job.generation), 0)
+
+    def cancel(self, key : Hashable) -> None:
+        """
+        Drops the pending job of a key, if any
+
+        :param key: The key of the job
+        """
+
+        with self._lock:
+            self._jobs.pop(key, None)
+            self._last_run.pop(key, None)
+
+    def cancel_all(self) -> None:
+        """
+        Drops all pending jobs
+        """
+
+        with self._lock:
+            self._jobs.clear()
+            self._last_run.clear()
+
+    def _new_job(self, callback : Callable, args : tuple, delay : int, throttled : bool = False) -> _Job:
+        """
+        Creates a job with a new generation token. Must be called with the lock held.
+
+        :param callback: The callback to run
+        :param args: The arguments of the callback
+        :param delay: Time in ms until the job is due
+        :param throttled: Whether the time of running it must be remembered for throttling
+        """
+
+        self._generation += 1
+        self._metrics['scheduled'] += 1
+        return _Job(self._generation, callback, args, time.monotonic() + delay / 1000, throttled)
+
+    def _run(self, key : Hashable, generation : int) -> None:
+        """
+        Runs the pending job of a key, unless it has been replaced or cancelled
+
+        :param key: The key of the job
+        :param generation: The generation token of the job the timeout was set for
+        """
+
+        with self._lock:
+            job = self._jobs.get(key)
+            if job is None or job.generation != generation:
+                return
+            del self._jobs[key]
+
+            now = time.monotonic()
+            if job.throttled:
+                self._last_run[key] = now
+            self._metrics['executed'] += 1
+            if (now - job.due) * 1000 > LATE_THRESHOLD:
+                self._metrics['late'] += 1
+
+        try:
+            job.callback(*job.args)
+        except Exception as e:
+            _logger.error(f"Failed running scheduled job '{key}' ({job.callback}): {e}")
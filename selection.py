@@ -8,8 +8,18 @@ import logging
 _logger = logging.getLogger(__name__)
 
 import sublime
+import sublime_plugin
 
-from typing import Union
+from array import array
+from collections import namedtuple
+from typing import Union, List, Iterable
+
+# The changes of a selection since it was last tracked. Added and removed are lists of regions,
+# moved is a list of (old region, new region) tuples.
+SelectionDiff = namedtuple('SelectionDiff', ['added', 'removed', 'moved'])
+
+# Selection trackers per view id
+_trackers = {}
 
 def get_caret_points(view : sublime.View) -> int:
     """
@@ -78,18 +88,52 @@ def select_and_zoom_to_region(view   : sublime.View,
     :param region:  The region to select
     """
 
+    select_and_zoom_to_regions(view, [region])
+
+def select_and_zoom_to_regions(view    : sublime.View,
+                               regions : Iterable[sublime.Region],
+                               reveal  : str = 'first') -> None:
+    """
+    Selects several regions at once and moves view to their contents, redrawing only once.
+
+    :param view:    The applicable view
+    :param regions: The regions to select
+    :param reveal:  Which to move the view to; 'first' region in buffer, region 'nearest' to the
+                    current caret, or the 'bounding' region of all of them
+    :raises ValueError: Raised if reveal is not supported
+    """
+
+    # Checked before the view is changed in any way
+    if reveal not in ('first', 'nearest', 'bounding'):
+        raise ValueError(f"Unsupported reveal '{reveal}'.")
+
+    regions = list(regions)
+    if not regions:
+        return
+
     sel = view.sel()
+    if len(sel) > 0:
+        caret = sel[0].b
 
-    # NOTE: There is a bug is Sublime build 4192 that selection is not updated unless the screen
-    # updates. Thus if you are already centered around the word you want to select, the selection
-    # won't update (because show_at_center will not cause the view to update).
-    # This circumvents that
-    row = view.rowcol(sel[0].begin())[0]
-    view.run_command("goto_line", {"line": row} )
+        # NOTE: There is a bug is Sublime build 4192 that selection is not updated unless the
+        # screen updates. Thus if you are already centered around the word you want to select, the
+        # selection won't update (because show_at_center will not cause the view to update).
+        # This circumvents that
+        row = view.rowcol(sel[0].begin())[0]
+        view.run_command("goto_line", {"line": row} )
+    else:
+        caret = 0
+
+    if reveal == 'first':
+        target = min(regions, key = lambda r : r.begin())
+    elif reveal == 'nearest':
+        target = min(regions, key = lambda r : abs(r.b - caret))
+    else:
+        target = sublime.Region(min(r.begin() for r in regions), max(r.end() for r in regions))
 
     sel.clear()
-    sel.add(region)
-    view.show_at_center(sel[0])
+    sel.add_all(regions)
+    view.show_at_center(target)
 
 def reverse_region(region : sublime.Region) -> sublime.Region:
     """
@@ -99,3 +143,124 @@ def reverse_region(region : sublime.Region) -> sublime.Region:
     """
 
     return sublime.Region(region.end(), region.begin())
+
+class SelectionTracker():
+    """
+    Tracks the selection of a view, keeping the last seen selection as a flat array of region
+    points, to determine cheaply if and how it changed
+    """
+
+    def __init__(self, view : sublime.View):
+        """
+        Initializes the tracker with the current selection of the view
+
+        :param view: The applicable view
+        """
+
+        self._view = view
+        self._points = self._read()
+        self._change_count = view.change_count()
+
+    @property
+    def regions(self) -> List[sublime.Region]:
+        """
+        Property reflecting the last tracked selection
+
+        :returns: The list of regions
+        """
+
+        points = self._points
+        return [sublime.Region(points[i], points[i + 1]) for i in range(0, len(points), 2)]
+
+    def has_changed(self) -> bool:
+        """
+        Determines if the selection or buffer changed since last tracked, without updating
+        """
+
+        if self._view.change_count() != self._change_count:
+            return True
+
+        # Most changes show in the number of regions or the first or last one, which is checked
+        # without reading the whole selection
+        sel = self._view.sel()
+        points = self._points
+        count = len(sel)
+        if count * 2 != len(points):
+            return True
+        if count == 0:
+            return False
+        first = sel[0]
+        last = sel[count - 1]
+        if (first.a, first.b, last.a, last.b) != (points[0], points[1], points[-2], points[-1]):
+            return True
+
+        for i, region in enumerate(sel):
+            if region.a != points[2 * i] or region.b != points[2 * i + 1]:
+                return True
+        return False
+
+    def update(self) -> SelectionDiff:
+        """
+        Tracks the current selection
+
+        :returns: The changes since last tracked. Regions that were replaced one-to-one (e.g.
+                  carets that moved) are reported as moved.
+        """
+
+        old_points = self._points
+        points = self._read()
+        self._change_count = self._view.change_count()
+        if points == old_points:
+            return SelectionDiff([], [], [])
+
+        self._points = points
+
+        old_pairs = set(zip(old_points[::2], old_points[1::2]))
+        new_pairs = set(zip(points[::2], points[1::2]))
+        added = sorted(new_pairs - old_pairs)
+        removed = sorted(old_pairs - new_pairs)
+
+        if len(added) == len(removed):
+            moved = [(sublime.Region(*old), sublime.Region(*new))
+                for old, new in zip(removed, added)]
+            return SelectionDiff([], [], moved)
+
+        return SelectionDiff(
+            [sublime.Region(*pair) for pair in added],
+            [sublime.Region(*pair) for pair in removed],
+            [])
+
+    def _read(self) -> array:
+        """
+        Reads the current selection of the view
+
+        :returns: The flat array of region points
+        """
+
+        points = array('q')
+        for region in self._view.sel():
+            points.append(region.a)
+            points.append(region.b)
+        return points
+
+def get_tracker(view : sublime.View) -> SelectionTracker:
+    """
+    Gets the selection tracker of a view, creating it on first request
+
+    :param view: The applicable view
+    """
+
+    tracker = _trackers.get(view.id())
+    if tracker is None:
+        tracker = SelectionTracker(view)
+        _trackers[view.id()] = tracker
+    return tracker
+
+class SelectionTrackerListener(sublime_plugin.EventListener):
+    """
+    Discards the selection trackers of closed views. Import it into a plugin module for Sublime to
+    load it.
+    """
+
+    def on_close(self, view):
+        _trackers.pop(view.id(), None)
@@ -4,6 +4,7 @@ import logging
 _logger = logging.getLogger(__name__)
 
 import sublime
+import threading
 
 from .validators import *
 from . import status
@@ -11,22 +12,93 @@ from . import status
 class Settings():
     def __init__(self):
         self._settings = SettingsList()
+        self._ready = threading.Event()
+        self._ready_lock = threading.Lock()
+        self._on_ready_callbacks = []
+        self._initialized = False
+
+    def init(self, default_log_level, log_level_callback, *, deferred = False):
+        """
+        Initializes the settings
+
+        :param default_log_level: The default log level if not provided in settings file
+        :param log_level_callback: Callback run when the log level changes
+        :param deferred: Whether to validate the settings file and run the change callbacks in the
+                         background (set_timeout_async) instead of right away. Until then the
+                         settings have their default values. See add_on_ready.
+        """
 
-    def init(self, default_log_level, log_level_callback):
         self._settings_file = sublime.load_settings(f"{__name__.split('.')[0]}.sublime-settings")
         self._settings_file.add_on_change(__package__, self._on_settings_change)
 
         self._settings.add(LogLevelSetting('log_level', default_log_level))
         self.log_level.add_on_change(__package__, log_level_callback)
+        self._initialized = True
 
         # Call this once on creation to set it up
-        self._on_settings_change()
+        if deferred:
+            _logger.debug("Deferring loading settings.")
+            sublime.set_timeout_async(self._load, 0)
+        else:
+            self._load()
 
     def deinit(self):
         _logger.debug("Deleting settings.")
+        self._initialized = False
         self._settings_file.clear_on_change(__package__)
         self.log_level.clear_on_change(__package__)
 
+    @property
+    def is_ready(self):
+        """
+        Property reflecting whether the settings file has been loaded and validated
+        """
+
+        return self._ready.is_set()
+
+    def add_on_ready(self, callback):
+        """
+        Adds a callback run on the main thread once the settings file has been loaded and
+        validated. It is run right away if already done.
+
+        :param callback: The callback, without arguments
+        """
+
+        with self._ready_lock:
+            if not self._ready.is_set():
+                self._on_ready_callbacks.append(callback)
+                return
+        callback()
+
+    def wait_ready(self, timeout = None):
+        """
+        Blocks until the settings file has been loaded and validated. Must not be called on the
+        main thread when deferred.
+
+        :param timeout: Max time in seconds to wait, or None to wait forever
+        :returns: True if ready, False if timed out
+        """
+
+        return self._ready.wait(timeout)
+
+    def _load(self):
+        """
+        Loads and validates the settings file, then notifies that the settings are ready
+        """
+
+        if not self._initialized:
+            return
+
+        self._on_settings_change()
+        with self._ready_lock:
+            self._ready.set()
+            callbacks = self._on_ready_callbacks
+            self._on_ready_callbacks = []
+        _logger.debug("Settings ready.")
+
+        for callback in callbacks:
+            sublime.set_timeout(callback, 0)
+
     def __getattr__(self, name):
         if not name.startswith("_"):
             try:
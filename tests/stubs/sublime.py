@@ -0,0 +1,91 @@
+"""
+A minimal stand-in for Sublime's sublime module, for testing the pure Python parts of the package
+
+Timeouts are queued instead of run, see run_timeouts.
+"""
+
+import json
+import threading
+import time
+
+_timeouts = []
+_timeouts_lock = threading.Lock()
+
+# The directory returned by cache_path, set by tests
+_cache_path = None
+
+# Settings file name -> dictionary of settings returned by load_settings, set by tests
+_settings = {}
+
+class Region():
+
+    def __init__(self, a, b = None):
+        self.a = a
+        self.b = a if b is None else b
+
+    def __eq__(self, other):
+        return isinstance(other, Region) and (self.a, self.b) == (other.a, other.b)
+
+    def __hash__(self):
+        return hash((self.a, self.b))
+
+    def __len__(self):
+        return self.size()
+
+    def __repr__(self):
+        return f"Region({self.a}, {self.b})"
+
+    def begin(self):
+        return min(self.a, self.b)
+
+    def end(self):
+        return max(self.a, self.b)
+
+    def size(self):
+        return self.end() - self.begin()
+
+    def empty(self):
+        return self.a == self.b
+
+class Selection(): pass
+class TextChange(): pass
+class View(): pass
+class Window(): pass
+
+def set_timeout(callback, delay = 0):
+    with _timeouts_lock:
+        _timeouts.append(callback)
+
+set_timeout_async = set_timeout
+
+def run_timeouts(until = None, timeout = 5.0):
+    """
+    Runs the queued timeouts, including those queued meanwhile
+
+    :param until: Callable returning whether to stop, e.g. once background jobs delivered their
+                  results. If None, stops once no timeouts are queued.
+    :param timeout: Max time in seconds to wait for until
+    :raises TimeoutError: Raised if until did not become true in time
+    """
+
+    deadline = time.monotonic() + timeout
+    while True:
+        with _timeouts_lock:
+            callback = _timeouts.pop(0) if _timeouts else None
+        if callback is not None:
+            callback()
+        elif until is None or until():
+            return
+        elif time.monotonic() >= deadline:
+            raise TimeoutError("Timed out running timeouts.")
+        else:
+            time.sleep(0.001)
+
+def cache_path():
+    return _cache_path
+
+def load_settings(name):
+    return _settings.setdefault(name, {})
+
+def decode_value(data):
+    return json.loads(data)
@@ -0,0 +1,8 @@
+"""
+A minimal stand-in for Sublime's sublime_plugin module
+"""
+
+class EventListener(): pass
+class TextChangeListener(): pass
+class TextCommand(): pass
+class WindowCommand(): pass
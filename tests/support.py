@@ -0,0 +1,25 @@
+"""
+Imports the package against the stub sublime modules in tests/stubs
+"""
+
+import importlib
+import os
+import sys
+
+PACKAGE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PACKAGE_NAME = os.path.basename(PACKAGE_DIR)
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "stubs"))
+sys.path.insert(1, os.path.dirname(PACKAGE_DIR))
+
+import sublime
+
+def import_submodule(name):
+    """
+    Imports a submodule of the package
+
+    :param name: The submodule name
+    :returns: The module
+    """
+
+    return importlib.import_module(f"{PACKAGE_NAME}.{name}")
@@ -0,0 +1,99 @@
+import os
+import random
+import tempfile
+import unittest
+
+import support
+import sublime
+
+cache_store = support.import_submodule("cache_store")
+
+class CacheStoreTest(unittest.TestCase):
+
+    def setUp(self):
+        random.seed(0)
+        self._dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self._dir.name, "sub", "test.cache")
+
+    def tearDown(self):
+        self._dir.cleanup()
+
+    def test_operations_match_dictionary(self):
+        store = cache_store.CacheStore(self.path, version = 1)
+        # Key -> (stamp, value)
+        expected = {}
+        for i in range(2000):
+            key = random.randint(0, 20)
+            op = random.choice(["put", "put", "get", "get", "remove", "save", "reopen", "clear"])
+            if op == "put":
+                value = random.choice([None, i, f"value {i}", [i] * random.randint(0, 5)])
+                stamp = random.randint(0, 2)
+                store.put(key, value, stamp)
+                expected[key] = (stamp, value)
+            elif op == "get":
+                stamp = random.randint(0, 2)
+                value = store.get(key, stamp, default = "missing")
+                if key in expected and expected[key][0] == stamp:
+                    self.assertEqual(value, expected[key][1])
+                else:
+                    # Outdated values are discarded
+                    self.assertEqual(value, "missing")
+                    expected.pop(key, None)
+            elif op == "remove":
+                store.remove(key)
+                expected.pop(key, None)
+            elif op == "save":
+                store.save()
+            elif op == "reopen":
+                store.save()
+                store.close()
+                store = cache_store.CacheStore(self.path, version = 1)
+            elif random.random() < 0.1:
+                store.clear()
+                expected.clear()
+
+            self.assertEqual(len(store), len(expected))
+            self.assertEqual(sorted(store.keys()), sorted(expected))
+        store.close()
+
+    def test_other_version_is_discarded(self):
+        store = cache_store.CacheStore(self.path, version = 1)
+        store.put("key", "value")
+        store.save()
+        store.close()
+        self.assertEqual(len(cache_store.CacheStore(self.path, version = 2)), 0)
+        self.assertEqual(cache_store.CacheStore(self.path, version = 1).get("key"), "value")
+
+    def test_corrupt_value_is_discarded(self):
+        store = cache_store.CacheStore(self.path)
+        store.put("a", "x" * 100)
+        store.put("b", "y" * 100)
+        store.save()
+        store.close()
+
+        with open(self.path, "r+b") as f:
+            data = f.read()
+            f.seek(data.index(b"x" * 100))
+            f.write(b"z")
+
+        store = cache_store.CacheStore(self.path)
+        with self.assertLogs(cache_store.__name__, "WARNING"):
+            self.assertIsNone(store.get("a"))
+        self.assertEqual(store.get("b"), "y" * 100)
+        self.assertNotIn("a", store)
+        store.close()
+
+    def test_get_store(self):
+        sublime._cache_path = self._dir.name
+        try:
+            store = cache_store.get_store("test", version = 1)
+            self.assertIs(cache_store.get_store("test"), store)
+            store.put("key", "value")
+            cache_store.save_all()
+            self.assertTrue(os.path.isfile(store.path))
+        finally:
+            sublime._cache_path = None
+            cache_store._stores.clear()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,143 @@
+"""
+Checks that importing each submodule stays within the package's IMPORT_BUDGET_MS
+
+Each submodule is imported in a fresh interpreter with -X importtime, against stub sublime and
+sublime_plugin modules. The stdlib modules Sublime's own API modules import are loaded first, as
+they are already loaded in the plugin host. Run this file directly to print the times.
+"""
+
+import os
+import re
+import subprocess
+import sys
+import tempfile
+import unittest
+
+PACKAGE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PACKAGE_NAME = os.path.basename(PACKAGE_DIR)
+
+# Submodules requiring the python-util git submodule
+UTIL_SUBMODULES = {'edit', 'menu', 'misc', 'util'}
+
+_STUB_SUBLIME = """
+class Region: pass
+class Selection: pass
+class TextChange: pass
+class View: pass
+class Window: pass
+def set_timeout(callback, delay = 0): pass
+def set_timeout_async(callback, delay = 0): pass
+"""
+
+_STUB_SUBLIME_PLUGIN = """
+class EventListener: pass
+class TextChangeListener: pass
+class TextCommand: pass
+class WindowCommand: pass
+"""
+
+# Imports the package, then the submodule given as argument, printing the budget. Uses
+# __import__, as -X importtime does not report importlib.import_module.
+_SCRIPT = """
+import importlib, io, json, os, sys, threading, time, traceback, typing, zipfile
+import sublime, sublime_plugin
+package = __import__({package!r})
+print(package.IMPORT_BUDGET_MS)
+__import__({package!r} + "." + sys.argv[1])
+"""
+
+_IMPORTTIME_LINE = re.compile(r"^import time:\s*(\d+)\s*\|\s*(\d+)\s*\|\s*(.*)$")
+
+def _has_util():
+    """
+    Determines if the python-util git submodule is checked out
+    """
+
+    util_dir = os.path.join(PACKAGE_DIR, 'util')
+    return os.path.isdir(util_dir) and bool(os.listdir(util_dir))
+
+def _write_stubs(stub_dir):
+    """
+    Writes the stub sublime modules
+
+    :param stub_dir: The directory to write them to
+    """
+
+    for name, source in (("sublime", _STUB_SUBLIME), ("sublime_plugin", _STUB_SUBLIME_PLUGIN)):
+        with open(os.path.join(stub_dir, f"{name}.py"), "w") as f:
+            f.write(source)
+
+def _get_submodules():
+    """
+    Gets the names of the lazily loaded submodules, without importing the package
+    """
+
+    with open(os.path.join(PACKAGE_DIR, "__init__.py"), encoding = "utf-8") as f:
+        source = f.read()
+    body = re.search(r"_SUBMODULES = frozenset\(\[(.*?)\]\)", source, re.DOTALL).group(1)
+    return sorted(re.findall(r"'(\w+)'", body))
+
+def measure(stub_dir, name):
+    """
+    Measures importing a submodule in a fresh interpreter
+
+    :param stub_dir: The directory of the stub sublime modules
+    :param name: The submodule name
+    :returns: A tuple of the cumulative time in ms, and the budget in ms
+    """
+
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join([stub_dir, os.path.dirname(PACKAGE_DIR)])
+    env.pop('PYTHONDONTWRITEBYTECODE', None)
+    script = _SCRIPT.format(package = PACKAGE_NAME)
+
+    # Run twice, so that the measured run uses the bytecode cache like the plugin host does
+    for _ in range(2):
+        result = subprocess.run([sys.executable, "-X", "importtime", "-c", script, name],
+            env = env, capture_output = True, text = True, check = True)
+
+    full_name = f"{PACKAGE_NAME}.{name}"
+    for line in result.stderr.splitlines():
+        match = _IMPORTTIME_LINE.match(line)
+        if match and match.group(3).strip() == full_name:
+            return int(match.group(2)) / 1000, float(result.stdout.strip())
+    raise AssertionError(f"No import time reported for '{full_name}'.")
+
+class ImportTimeTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls._stub_dir = tempfile.TemporaryDirectory()
+        _write_stubs(cls._stub_dir.name)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls._stub_dir.cleanup()
+
+    def test_package_loads_no_submodules(self):
+        env = dict(os.environ)
+        env['PYTHONPATH'] = os.pathsep.join([self._stub_dir.name, os.path.dirname(PACKAGE_DIR)])
+        script = (f"import sys, {PACKAGE_NAME}\n"
+            f"print(sorted(m for m in sys.modules if m.startswith('{PACKAGE_NAME}.')))")
+        result = subprocess.run([sys.executable, "-c", script], env = env, capture_output = True,
+            text = True, check = True)
+        self.assertEqual(result.stdout.strip(), "[]")
+
+    def test_submodules_within_budget(self):
+        for name in _get_submodules():
+            with self.subTest(submodule = name):
+                if name in UTIL_SUBMODULES and not _has_util():
+                    self.skipTest("The python-util git submodule is not checked out.")
+                elapsed, budget = measure(self._stub_dir.name, name)
+                self.assertLessEqual(elapsed, budget,
+                    f"Importing '{name}' took {elapsed:.1f} ms, exceeding the budget of {budget} ms.")
+
+if __name__ == '__main__':
+    with tempfile.TemporaryDirectory() as stub_dir:
+        _write_stubs(stub_dir)
+        for name in _get_submodules():
+            if name in UTIL_SUBMODULES and not _has_util():
+                print(f"{name:<16} skipped")
+                continue
+            elapsed, budget = measure(stub_dir, name)
+            print(f"{name:<16} {elapsed:6.1f} ms{'  OVER BUDGET' if elapsed > budget else ''}")
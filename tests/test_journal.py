@@ -0,0 +1,92 @@
+import random
+import unittest
+
+from types import SimpleNamespace
+
+import support
+
+journal = support.import_submodule("journal")
+
+class JournalTest(unittest.TestCase):
+
+    def setUp(self):
+        random.seed(0)
+
+    def tearDown(self):
+        journal._journals.clear()
+
+    def _modify(self, text, count):
+        """
+        Applies random modifications to text of characters identified by their original offset
+
+        :returns: A tuple of the modified text, and the (offset, removed, inserted) tuples
+        """
+
+        changes = []
+        for _ in range(count):
+            offset = random.randint(0, len(text))
+            removed = random.randint(0, min(len(text) - offset, 5))
+            inserted = random.choice([0, 0, 1, 3])
+            text = text[:offset] + [None] * inserted + text[offset + removed:]
+            changes.append((offset, removed, inserted))
+        return text, changes
+
+    def test_map_offsets_follow_kept_text(self):
+        for _ in range(500):
+            original = list(range(random.randint(0, 30)))
+            j = journal.Journal(0, max_entries = 1000)
+            text = original
+            for change_count in range(1, random.randint(1, 5)):
+                text, changes = self._modify(text, random.randint(1, 3))
+                j.record(change_count, changes)
+
+            # Offsets before kept characters follow them, placed before text inserted right
+            # there unless mapped to the right
+            mapped = j.map_offsets(original, 0)
+            mapped_right = j.map_offsets(original, 0, right = True)
+            for offset, left, right in zip(original, mapped, mapped_right):
+                self.assertLessEqual(left, right)
+                self.assertLessEqual(right, len(text))
+                if offset in text:
+                    self.assertEqual(text.index(offset), right)
+                    self.assertEqual(text[left:right], [None] * (right - left))
+
+    def test_changed_regions_cover_inserted_text(self):
+        for _ in range(500):
+            original = list(range(random.randint(0, 30)))
+            j = journal.Journal(0, max_entries = 1000)
+            text, changes = self._modify(original, random.randint(1, 6))
+            j.record(1, changes)
+
+            regions = j.changed_regions_since(0)
+            for begin, end in zip(regions, regions[1:]):
+                self.assertLess(begin.end(), end.begin())
+            for i, char in enumerate(text):
+                if char is None:
+                    self.assertTrue(any(r.begin() <= i < r.end() for r in regions))
+            # Kept text outside the regions stays in order
+            kept = [char for i, char in enumerate(text)
+                if not any(r.begin() <= i < r.end() for r in regions)]
+            self.assertNotIn(None, kept)
+            self.assertEqual(kept, sorted(kept))
+
+    def test_trim_drops_old_changes(self):
+        j = journal.Journal(0, max_entries = 10)
+        for change_count in range(1, 21):
+            j.record(change_count, [(0, 0, 1)])
+        self.assertLessEqual(len(j), 10)
+        self.assertIsNone(j.changes_since(0))
+        self.assertEqual(j.changes_since(19), [(0, 0, 1)])
+
+    def test_lagging_journal_is_not_returned(self):
+        view = SimpleNamespace(buffer_id = lambda : 1, change_count = lambda : count)
+        count = 3
+        j = journal.get_journal(view)
+        self.assertIs(journal.get_journal(view), j)
+        count = 4
+        self.assertIsNone(journal.get_journal(view))
+        j.record(4, [(0, 0, 1)])
+        self.assertIs(journal.get_journal(view), j)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,89 @@
+import os
+import tempfile
+import unittest
+
+import support
+import sublime
+
+project = support.import_submodule("project")
+jobs = support.import_submodule("jobs")
+
+class DataTest(unittest.TestCase):
+
+    def setUp(self):
+        self._dir = tempfile.TemporaryDirectory()
+        self.project_path = os.path.join(self._dir.name, "test.sublime-project")
+        with open(self.project_path, "w") as f:
+            f.write('{"settings": {"tab_size": 2}, "build_systems": [{"name": "make"}]}')
+        project._data_cache.clear()
+
+    def tearDown(self):
+        self._dir.cleanup()
+        project._data_cache.clear()
+
+    def test_settings_and_build_systems_are_copies(self):
+        project.get_settings(self.project_path)['tab_size'] = 4
+        project.get_build_systems(self.project_path)[0]['name'] = "ninja"
+        self.assertEqual(project.get_settings(self.project_path), {'tab_size' : 2})
+        self.assertEqual(project.get_build_systems(self.project_path), [{'name' : "make"}])
+
+    def test_workspace_files_are_not_cached(self):
+        workspace_path = os.path.join(self._dir.name, "test.sublime-workspace")
+        with open(workspace_path, "w") as f:
+            f.write('{"buffers": []}')
+        self.assertEqual(project.get_data(workspace_path), {'buffers' : []})
+        self.assertEqual(list(project._data_cache), [])
+        project.get_data(self.project_path)
+        self.assertEqual(list(project._data_cache), [self.project_path])
+
+class FileIndexTest(unittest.TestCase):
+
+    def setUp(self):
+        self._dir = tempfile.TemporaryDirectory()
+        self.root = self._dir.name
+        self.project_path = os.path.join(self.root, "test.sublime-project")
+        with open(self.project_path, "w") as f:
+            f.write('{"folders": [{"path": "src"}]}')
+        for path in ["src/a.py", "src/sub/b.py", "other/c.py"]:
+            path = os.path.join(self.root, path)
+            os.makedirs(os.path.dirname(path), exist_ok = True)
+            open(path, "w").close()
+        sublime._settings.clear()
+
+    def tearDown(self):
+        self._dir.cleanup()
+
+    def _files(self, index):
+        return sorted(os.path.relpath(path, self.root) for path in index.files())
+
+    def test_refresh_async(self):
+        index = project.FileIndex(self.project_path)
+        done = []
+        index.refresh_async(lambda : done.append(True))
+        sublime.run_timeouts(until = lambda : done)
+        self.assertEqual(self._files(index), ["src/a.py", "src/sub/b.py"])
+
+    def test_symlinked_directories(self):
+        os.symlink(os.path.join(self.root, "other"), os.path.join(self.root, "src", "link"))
+        os.symlink(self.root, os.path.join(self.root, "src", "loop"))
+        index = project.FileIndex(self.project_path)
+        index.refresh()
+        self.assertEqual(self._files(index), ["src/a.py", "src/sub/b.py"])
+
+        with open(self.project_path, "w") as f:
+            f.write('{"folders": [{"path": "src", "follow_symlinks": true}]}')
+        index.refresh()
+        self.assertIn("src/link/c.py", self._files(index))
+
+    def test_cancelled_refresh_keeps_previous_result(self):
+        index = project.FileIndex(self.project_path)
+        index.refresh()
+        token = jobs.CancellationToken()
+        token.cancel()
+        open(os.path.join(self.root, "src", "d.py"), "w").close()
+        with self.assertRaises(jobs.JobCancelled):
+            index.refresh(token)
+        self.assertEqual(self._files(index), ["src/a.py", "src/sub/b.py"])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,96 @@
+import random
+import unittest
+
+import support
+import sublime
+
+region_set = support.import_submodule("region_set")
+RegionSet = region_set.RegionSet
+
+def random_regions(count, size = 60):
+    regions = []
+    for _ in range(count):
+        begin = random.randint(0, size)
+        end = random.choice([begin, min(size, begin + random.randint(1, 10))])
+        regions.append(sublime.Region(*random.choice([(begin, end), (end, begin)])))
+    return regions
+
+def cells(regions):
+    """
+    Gets the points covered by non-empty regions, as the half-open cells [point, point + 1)
+    """
+
+    return {point for region in regions for point in range(region.begin(), region.end())}
+
+def runs(points):
+    """
+    Gets the regions of maximal runs of consecutive cells
+    """
+
+    regions = []
+    for point in sorted(points):
+        if regions and regions[-1].b == point:
+            regions[-1] = sublime.Region(regions[-1].a, point + 1)
+        else:
+            regions.append(sublime.Region(point, point + 1))
+    return regions
+
+def split(region_set):
+    """
+    Gets the non-empty regions and the points of the empty regions of a set
+    """
+
+    regions = region_set.to_regions()
+    return [r for r in regions if not r.empty()], [r.a for r in regions if r.empty()]
+
+class RegionSetTest(unittest.TestCase):
+
+    def setUp(self):
+        random.seed(0)
+
+    def test_from_regions_and_add(self):
+        for _ in range(500):
+            regions = random_regions(random.randint(0, 8))
+            built = RegionSet()
+            for region in regions:
+                built.add(region)
+            merged = RegionSet.from_regions(regions)
+            self.assertEqual(built, merged)
+
+            non_empty, points = split(merged)
+            self.assertEqual(cells(non_empty), cells(regions))
+            for a, b in zip(merged.to_regions(), merged.to_regions()[1:]):
+                self.assertLess(a.end(), b.begin())
+            for point in range(62):
+                self.assertEqual(point in merged,
+                    any(r.begin() <= point <= r.end() for r in regions))
+
+    def test_set_operations(self):
+        for _ in range(1000):
+            regions = random_regions(random.randint(0, 8))
+            other_regions = random_regions(random.randint(0, 8))
+            a = RegionSet.from_regions(regions)
+            b = RegionSet.from_regions(other_regions)
+
+            self.assertEqual(split(a.union(b))[0], runs(cells(regions) | cells(other_regions)))
+            self.assertEqual(split(a.intersect(b))[0],
+                runs(cells(regions) & cells(other_regions)))
+
+            non_empty, points = split(a.subtract(b))
+            self.assertEqual(non_empty, runs(cells(regions) - cells(other_regions)))
+            self.assertEqual(points, [point for point in split(a)[1] if point not in b])
+
+    def test_subtract_empty_region(self):
+        a = RegionSet.from_regions([sublime.Region(0, 10)])
+        b = RegionSet.from_regions([sublime.Region(5, 5)])
+        self.assertEqual(a.subtract(b).to_regions(), [sublime.Region(0, 10)])
+
+    def test_overlapping(self):
+        for _ in range(500):
+            a = RegionSet.from_regions(random_regions(random.randint(0, 8)))
+            region = random_regions(1)[0]
+            self.assertEqual(a.overlapping(region).to_regions(),
+                [r for r in a if r.end() >= region.begin() and r.begin() <= region.end()])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,59 @@
+import random
+import unittest
+
+import support
+import sublime
+
+scheduler = support.import_submodule("scheduler")
+
+class SchedulerTest(unittest.TestCase):
+
+    def setUp(self):
+        random.seed(0)
+
+    def test_latest_job_per_key_runs_once(self):
+        s = scheduler.Scheduler()
+        calls = []
+        # Key -> arguments of the pending job
+        pending = {}
+        executed = 0
+        for i in range(3000):
+            key = random.randint(0, 4)
+            op = random.choice(["debounce", "throttle", "coalesce", "cancel", "run"])
+            if op == "debounce":
+                s.debounce(key, 10, lambda *args : calls.append(args), key, i)
+                pending[key] = (key, i)
+            elif op == "throttle":
+                s.throttle(key, 10, lambda *args : calls.append(args), key, i)
+                pending[key] = (key, i)
+            elif op == "coalesce":
+                s.coalesce(key, lambda *args : calls.append(args), key, i)
+                pending[key] = (key, i)
+            elif op == "cancel":
+                s.cancel(key)
+                pending.pop(key, None)
+            else:
+                sublime.run_timeouts()
+                self.assertEqual(sorted(calls), sorted(pending.values()))
+                executed += len(calls)
+                calls.clear()
+                pending.clear()
+
+            self.assertEqual(s.is_pending(key), key in pending)
+
+        sublime.run_timeouts()
+        executed += len(calls)
+        self.assertEqual(sorted(calls), sorted(pending.values()))
+        self.assertEqual(s.metrics['executed'], executed)
+
+    def test_failing_callback(self):
+        s = scheduler.Scheduler()
+        calls = []
+        s.coalesce(1, lambda : 1 / 0)
+        s.coalesce(2, calls.append, True)
+        with self.assertLogs(scheduler.__name__, "ERROR"):
+            sublime.run_timeouts()
+        self.assertEqual(calls, [True])
+
+if __name__ == '__main__':
+    unittest.main()
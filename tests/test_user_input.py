@@ -0,0 +1,67 @@
+import threading
+import unittest
+
+from types import SimpleNamespace
+
+import support
+import sublime
+
+user_input = support.import_submodule("user_input")
+
+class FakeWindow():
+    """
+    A window recording the input panels shown and status messages
+    """
+
+    def __init__(self):
+        self.panels = []
+        self.status = None
+
+    def show_input_panel(self, **kwargs):
+        self.panels.append(SimpleNamespace(**kwargs))
+
+    def status_message(self, text):
+        self.status = text
+
+class ShowInputTest(unittest.TestCase):
+
+    def setUp(self):
+        self.window = FakeWindow()
+        self._active_window = getattr(sublime, 'active_window', None)
+        sublime.active_window = lambda : self.window
+
+    def tearDown(self):
+        sublime.active_window = self._active_window
+        user_input._scheduler.cancel_all()
+
+    def _validator(self, text):
+        self.threads.append(threading.current_thread())
+        return None if text.isdigit() else "Not a number"
+
+    def test_enter_validates_asynchronously(self):
+        self.threads = []
+        applied = []
+        user_input.show_input("Number", "", applied.append, validator = self._validator,
+            asynchronous_validation = True)
+
+        self.window.panels[-1].on_done("12")
+        self.assertEqual(applied, [])
+        sublime.run_timeouts(until = lambda : applied)
+        self.assertEqual(applied, ["12"])
+
+        self.window.panels[-1].on_done("x")
+        sublime.run_timeouts(until = lambda : len(self.window.panels) == 2)
+        self.assertEqual(self.window.panels[-1].initial_text, "x")
+        self.assertEqual(self.window.status, "Not a number")
+        self.assertEqual(applied, ["12"])
+        self.assertNotIn(threading.main_thread(), self.threads)
+
+    def test_enter_validates_synchronously(self):
+        self.threads = []
+        applied = []
+        user_input.show_input("Number", "", applied.append, validator = self._validator)
+        self.window.panels[-1].on_done("12")
+        self.assertEqual(applied, ["12"])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,177 @@
+import random
+import re
+import unittest
+
+from collections import Counter
+from types import SimpleNamespace
+
+import support
+import sublime
+
+vocabulary = support.import_submodule("vocabulary")
+
+WORDS = ["alpha", "alpine", "beta", "betamax", "gamma", "foo", "food"]
+
+class FakeView():
+    """
+    A buffer of text supporting what the vocabulary uses of sublime.View
+    """
+
+    def __init__(self, buffer_id, text):
+        self.buffer_id_ = buffer_id
+        self.text = text
+        self.changes = 0
+
+    def id(self):
+        return self.buffer_id_
+
+    def buffer_id(self):
+        return self.buffer_id_
+
+    def change_count(self):
+        return self.changes
+
+    def is_valid(self):
+        return True
+
+    def size(self):
+        return len(self.text)
+
+    def substr(self, region):
+        return self.text[region.begin():region.end()]
+
+    def text_point(self, row, col):
+        return sum(len(line) + 1 for line in self.text.split("\n")[:row]) + col
+
+    def rowcol(self, point):
+        before = self.text[:point]
+        return before.count("\n"), len(before) - before.rfind("\n") - 1
+
+    def replace(self, begin, end, text):
+        """
+        Replaces text, returning the TextChange Sublime would report
+        """
+
+        change = SimpleNamespace(
+            a = SimpleNamespace(pt = begin, row = self.rowcol(begin)[0]),
+            b = SimpleNamespace(pt = end, row = self.rowcol(end)[0]),
+            str = text)
+        self.text = self.text[:begin] + text + self.text[end:]
+        self.changes += 1
+        return change
+
+def random_text(lines):
+    return "\n".join(" ".join(random.choice(WORDS) for _ in range(random.randint(0, 3)))
+        for _ in range(lines))
+
+def count_words(text):
+    return Counter(word for word in re.findall(r"\b(\w+)\b", text) if len(word) >= 3)
+
+def top(counts, prefix, limit):
+    return [(word, count) for count, word in sorted(
+        ((count, word) for word, count in counts.items() if word.startswith(prefix)),
+        reverse = True)[:limit]]
+
+class PrefixTrieTest(unittest.TestCase):
+
+    def setUp(self):
+        random.seed(0)
+
+    def test_queries_match_counts(self):
+        trie = vocabulary._PrefixTrie()
+        counts = Counter()
+        for _ in range(5000):
+            word = random.choice(WORDS + ["al", "a", "fo"])
+            if random.random() < 0.6 or not counts[word]:
+                count = random.randint(1, 3)
+                trie.add(word, count)
+                counts[word] += count
+            else:
+                count = random.randint(1, counts[word])
+                trie.remove(word, count)
+                counts[word] -= count
+            counts += Counter()
+
+            self.assertEqual(len(trie), len(counts))
+            # Query the same prefixes repeatedly, so that cached results are checked as well
+            prefix = random.choice(["", "a", "al", "alp", "b", "f", "foo", "x"])
+            limit = random.randint(1, 6)
+            self.assertEqual(trie.query(prefix, limit), top(counts, prefix, limit))
+
+        for word, count in list(counts.items()):
+            trie.remove(word, count)
+        self.assertEqual(len(trie), 0)
+        self.assertEqual(trie._root, {})
+
+class VocabularyTest(unittest.TestCase):
+
+    def setUp(self):
+        self._block_lines = vocabulary._BLOCK_LINES
+        vocabulary._BLOCK_LINES = 4
+        random.seed(0)
+
+    def tearDown(self):
+        vocabulary._BLOCK_LINES = self._block_lines
+        vocabulary._vocabularies.clear()
+        vocabulary._scheduler.cancel_all()
+
+    def _add(self, voc, view):
+        voc.add_view(view)
+        sublime.run_timeouts(until = lambda : not voc._pending)
+        self.assertIn(view.buffer_id(), voc._buffers)
+
+    def test_incremental_counts_match_full_count(self):
+        for _ in range(300):
+            view = FakeView(1, random_text(random.randint(1, 20)))
+            voc = vocabulary.Vocabulary()
+            self._add(voc, view)
+
+            for _ in range(5):
+                changes = []
+                for _ in range(random.randint(1, 3)):
+                    begin = random.randint(0, len(view.text))
+                    end = random.randint(begin, min(len(view.text), begin + 15))
+                    text = random.choice(["", "x", "\n", " gamma\nfoo ", random_text(3)])
+                    changes.append(view.replace(begin, end, text))
+
+                before = voc.query("", 1000)
+                voc.apply_changes(1, changes)
+                # Words remain counted until recounted
+                self.assertEqual(voc.query("", 1000), before)
+
+                voc._recount(1)
+                expected = count_words(view.text)
+                self.assertEqual(dict(voc.query("", 1000)), dict(expected))
+                for prefix in ["", "a", "al", "b", "f", "foo", "z"]:
+                    for limit in (1, 2, 5):
+                        self.assertEqual(voc.query(prefix, limit), top(expected, prefix, limit))
+
+    def test_remove_view(self):
+        voc = vocabulary.Vocabulary()
+        self._add(voc, FakeView(1, "alpha beta"))
+        self._add(voc, FakeView(2, "beta gamma"))
+        voc.remove_view(1)
+        self.assertEqual(dict(voc.query("", 10)), {"beta" : 1, "gamma" : 1})
+        voc.clear()
+        self.assertEqual(len(voc), 0)
+
+    def test_modified_while_counting(self):
+        voc = vocabulary.Vocabulary()
+        view = FakeView(1, "alpha")
+        voc.add_view(view)
+        view.replace(0, 5, "gamma")
+        sublime.run_timeouts(until = lambda : not voc._pending)
+        self.assertEqual(voc.query("", 10), [("gamma", 1)])
+
+    def test_seeded_from_window(self):
+        views = [FakeView(i, f"word{i} common") for i in range(80)]
+        window = SimpleNamespace(id = lambda : 1, views = lambda : views,
+            active_view = lambda : views[3])
+        voc = vocabulary.get_vocabulary(window)
+        sublime.run_timeouts(until = lambda : not voc._pending)
+        self.assertEqual(voc.query("common"), [("common", voc.max_views)])
+        # The active view is included although not among the last views
+        self.assertIn(3, voc)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -3,7 +3,145 @@ _logger = logging.getLogger(__name__)
 
 import sublime
 
-def show_input(caption, initial_text, on_done, on_cancel = None):
+from .scheduler import Scheduler
+
+# Time in ms to wait for further keystrokes before validating the input
+VALIDATION_DELAY = 250
+
+# Scheduler debouncing the live validation of inputs
+_scheduler = Scheduler()
+
+class _LiveValidation():
+    """
+    An internal-only class validating the text of an input panel while typing, and showing the
+    error in the status bar
+    """
+
+    def __init__(self, window, validator, asynchronous):
+        """
+        Initializes the validation
+
+        :param window: The window of the input panel
+        :param validator: Callback getting the text and returning an error message, or None if valid
+        :param asynchronous: Whether to run the validator on a background thread
+        """
+
+        self._window = window
+        self._validator = validator
+        self._asynchronous = asynchronous
+        # The job of the running asynchronous validation
+        self._job = None
+        # Tuple of (text, error) of the last validation
+        self._result = None
+        # The latest text of the input panel
+        self._text = None
+
+    def on_change(self, text):
+        """
+        Validates the text once no further keystrokes happened for VALIDATION_DELAY, cancelling the
+        running validation of the previous text
+
+        :param text: The text of the input panel
+        """
+
+        self._text = text
+        if self._job is not None:
+            self._job.cancel()
+            self._job = None
+        _scheduler.debounce(id(self), VALIDATION_DELAY, self._validate, text)
+
+    def validate_now(self, text, on_result):
+        """
+        Validates the text right away, unless its result is already known. An asynchronous
+        validation runs on the job queue instead of the main thread.
+
+        :param text: The text of the input panel
+        :param on_result: Callback run on the main thread with the error message, or None if valid
+        """
+
+        self.stop()
+        self._text = text
+        if self._result is not None and self._result[0] == text:
+            on_result(self._result[1])
+            return
+
+        if not self._asynchronous:
+            self._set_result(text, self._validator(text))
+            on_result(self._result[1])
+            return
+
+        from . import jobs
+
+        def _on_done(error):
+            self._set_result(text, error)
+            on_result(error)
+
+        def _on_error(e):
+            # Not remembered as result, so that the text is validated again
+            self._job = None
+            error = f"Failed validating input: {e}"
+            self._window.status_message(error)
+            on_result(error)
+
+        self._job = jobs.get_queue().submit(
+            lambda token : self._validator(text),
+            name = "validate input",
+            priority = jobs.PRIORITY_HIGH,
+            on_done = _on_done,
+            on_error = _on_error
+        )
+
+    def stop(self):
+        """
+        Cancels the pending and running validations
+        """
+
+        _scheduler.cancel(id(self))
+        if self._job is not None:
+            self._job.cancel()
+            self._job = None
+
+    def _validate(self, text):
+        """
+        Validates the text, cancelling the running validation of a previous text
+
+        :param text: The text of the input panel
+        """
+
+        if self._job is not None:
+            self._job.cancel()
+            self._job = None
+
+        if not self._asynchronous:
+            self._set_result(text, self._validator(text))
+            return
+
+        from . import jobs
+
+        self._job = jobs.get_queue().submit(
+            lambda token : self._validator(text),
+            name = "validate input",
+            priority = jobs.PRIORITY_HIGH,
+            on_done = lambda error : self._set_result(text, error)
+        )
+
+    def _set_result(self, text, error):
+        """
+        Remembers the result of a validation and shows it in the status bar, unless the text has
+        changed since
+
+        :param text: The validated text
+        :param error: The error message, or None if valid
+        """
+
+        if text != self._text:
+            return
+        self._job = None
+        self._result = (text, error)
+        self._window.status_message(error or "")
+
+def show_input(caption, initial_text, on_done, on_cancel = None, *, validator = None,
+               asynchronous_validation = False):
     """
     Shows an input panel and reshows it if validation (on_done callback returning False) fails
 
@@ -12,19 +150,56 @@ def show_input(caption, initial_text, on_done, on_cancel = None):
     :param on_done: Callback to be run (with input text as parameter) when applying input
     :               If returning False it will re-show the input dialog
     :param on_cancel: Callback to be run with cancelling
+    :param validator: Callback validating the text while typing (debounced), returning an error
+                      message shown in the status bar, or None if valid. Invalid input is not
+                      applied but re-shown.
+    :param asynchronous_validation: Whether to run the validator on a background thread, for
+                                    expensive checks like file system or project index lookups.
+                                    Results of outdated texts are discarded.
     """
 
-    def _input_callback(text):
+    window = sublime.active_window()
+    validation = _LiveValidation(window, validator, asynchronous_validation) \
+        if validator is not None else None
+
+    def _show_again(text):
+        show_input(caption, text, on_done, on_cancel, validator = validator,
+            asynchronous_validation = asynchronous_validation)
+
+    def _apply(text):
         if on_done(text) is False:
             _logger.debug(f"Failed validating input '{text}'.")
-            _show_input(caption, initial_text, on_done, on_cancel)
+            _show_again(text)
         else:
             _logger.debug(f"Applying input '{text}'.")
 
-    sublime.active_window().show_input_panel(
+    def _input_callback(text):
+        if validation is None:
+            _apply(text)
+            return
+
+        def _on_result(error):
+            if error is not None:
+                _logger.debug(f"Failed validating input '{text}': {error}")
+                _show_again(text)
+            else:
+                _apply(text)
+
+        validation.validate_now(text, _on_result)
+
+    def _cancel_callback():
+        if validation is not None:
+            validation.stop()
+        if on_cancel is not None:
+            on_cancel()
+
+    window.show_input_panel(
         caption = caption,
         initial_text = initial_text,
         on_done = _input_callback,
-        on_change = None,
-        on_cancel = on_cancel
+        on_change = validation.on_change if validation is not None else None,
+        on_cancel = _cancel_callback
     )
+
+    if validation is not None:
+        validation.on_change(initial_text)
@@ -9,8 +9,16 @@ _logger = logging.getLogger(__name__)
 
 from . import selection
 import sublime
+import re
 
-from typing import Union, Callable
+from collections import namedtuple
+from typing import Union, Callable, List
+
+# The pattern matching a word
+WORD_REGEX = r"\b(\w+)\b"
+
+# A match of a word search across views. Row and col are 0-based, line is the text of the line.
+WordMatch = namedtuple('WordMatch', ['view', 'region', 'row', 'col', 'line'])
 
 def _get_word_region_near_pt(view       : sublime.View,
                              pt         : int,
@@ -295,7 +303,7 @@ def get_region_of_closest_word_in_line(view            : sublime.View,
         if not forward:
             flags = flags | sublime.REVERSE
 
-        regex = r"\b(\w+)\b"
+        regex = WORD_REGEX
 
         if forward:
             line_region = sublime.Region(
@@ -362,3 +370,130 @@ def get_region_of_closest_word_in_line(view            : sublime.View,
     _logger.debug(f"{txt} word is '{adj_word}' ({line}, [{col_start}:{col_end}]).")
     return region
 
+
+def find_word_in_window(window          : sublime.Window,
+                        word            : str,
+                        case_sensitive  : bool,
+                        on_result       : Callable[[sublime.View, List[WordMatch]], None],
+                        on_done         : Union[Callable[[], None], None] = None
+                        ) -> List['jobs.Job']:
+    """
+    Finds a complete word in all views of a window. The text of each view is copied on the main
+    thread and then searched in the background, one job per view.
+
+    :param window:          The applicable window
+    :param word:            The word to find
+    :param case_sensitive:  Whether to match case sensitive or not
+    :param on_result:       Callback run on the main thread with each view and its matches, in
+                            order of the views in the window
+    :param on_done:         Callback run on the main thread when all views are searched
+    :returns: The jobs searching the views, to be able to cancel them
+    """
+
+    from . import jobs
+
+    flags = 0 if case_sensitive else re.IGNORECASE
+    pattern = re.compile(r"\b" + re.escape(word) + r"\b", flags)
+
+    views = window.views()
+    _logger.debug(f"Finding word '{word}' in {len(views)} views.")
+
+    # Results of views searched before the views preceding them, by index
+    pending = {}
+    next_index = 0
+
+    def _on_view_done(index, matches):
+        nonlocal next_index
+        pending[index] = matches
+        while next_index in pending:
+            view = views[next_index]
+            view_matches = pending.pop(next_index)
+            next_index += 1
+            try:
+                on_result(view, [WordMatch(view, sublime.Region(begin, end), row, col, line)
+                    for begin, end, row, col, line in view_matches])
+            except Exception as e:
+                # Keep delivering the results of the following views
+                _logger.error(f"Failed handling matches of view {view.id()}: {e}")
+
+        if next_index == len(views) and on_done is not None:
+            on_done()
+
+    queue = jobs.get_queue()
+    submitted = []
+    for index, view in enumerate(views):
+        text = view.substr(sublime.Region(0, view.size()))
+        submitted.append(queue.submit(_find_pattern_in_text, text, pattern,
+            name = f"find word in view {view.id()}",
+            priority = jobs.PRIORITY_HIGH,
+            on_done = lambda matches, index = index : _on_view_done(index, matches),
+            # A failed view is delivered without matches, so the following views are not held
+            on_error = lambda e, index = index : _on_view_done(index, [])))
+
+    if not views and on_done is not None:
+        on_done()
+    return submitted
+
+def show_word_in_window(window          : sublime.Window,
+                        word            : str,
+                        case_sensitive  : bool) -> List['jobs.Job']:
+    """
+    Finds a complete word in all views of a window and lists the matches in an output panel as
+    they are found. Matches in saved files can be double-clicked to go to them.
+
+    :param window:          The applicable window
+    :param word:            The word to find
+    :param case_sensitive:  Whether to match case sensitive or not
+    :returns: The jobs searching the views, to be able to cancel them
+    """
+
+    panel = window.create_output_panel("word_search")
+    panel.settings().set("result_file_regex", r"^(\S.*):$")
+    panel.settings().set("result_line_regex", r"^\s+(\d+):(\d+): ")
+    window.run_command("show_panel", {"panel": "output.word_search"})
+
+    count = 0
+
+    def _append(text):
+        panel.run_command("append", {"characters": text, "force": True, "scroll_to_end": False})
+
+    def _on_result(view, matches):
+        nonlocal count
+        if not matches:
+            return
+        count += len(matches)
+        name = view.file_name() or view.name() or f"untitled ({view.id()})"
+        lines = [f"{name}:"]
+        lines.extend(f"  {m.row + 1}:{m.col + 1}: {m.line}" for m in matches)
+        _append("\n".join(lines) + "\n\n")
+
+    def _on_done():
+        _append(f"{count} matches of '{word}'.\n")
+
+    return find_word_in_window(window, word, case_sensitive, _on_result, _on_done)
+
+def _find_pattern_in_text(token : 'jobs.CancellationToken', text : str, pattern : re.Pattern) -> list:
+    """
+    Finds all matches of a pattern in a text (in a job)
+
+    :param token:   The cancellation token of the job
+    :param text:    The text to search
+    :param pattern: The compiled pattern
+    :returns: A list of tuples of (begin, end, row, col, line text)
+    """
+
+    matches = []
+    row = 0
+    line_start = 0
+    for i, match in enumerate(pattern.finditer(text)):
+        if i % 1000 == 0:
+            token.raise_if_cancelled()
+
+        begin = match.start()
+        row += text.count("\n", line_start, begin)
+        line_start = text.rfind("\n", 0, begin) + 1
+        line_end = text.find("\n", begin)
+        if line_end == -1:
+            line_end = len(text)
+        matches.append((begin, match.end(), row, begin - line_start, text[line_start:line_end]))
+    return matches
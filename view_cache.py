@@ -0,0 +1,181 @@
+"""
+Module handling caching of results computed from the contents of views
+"""
+
+import logging
+
+# Local logger
+_logger = logging.getLogger(__name__)
+
+import sublime_plugin
+import functools
+import threading
+
+from collections import OrderedDict
+from typing import Callable
+
+# All caches created by cached_per_view, to purge them when views close
+_caches = []
+
+# Separates the positional from the keyword arguments in keys, like functools._make_key, so that
+# e.g. f(view, 1, x = 2) and f(view, (1,), (('x', 2),)) get different keys
+_KWARGS_MARK = (object(),)
+
+class _ViewCache():
+    """
+    An internal-only class holding the cached results of one function for all views
+    """
+
+    def __init__(self, maxsize, max_total):
+        """
+        Initializes the cache
+
+        :param maxsize: Max number of results per view
+        :param max_total: Max number of results for all views
+        """
+
+        self._maxsize = maxsize
+        self._max_total = max_total
+        self._lock = threading.Lock()
+        # View id -> (change count, OrderedDict of key -> result), least recently used view first
+        self._views = OrderedDict()
+        self._size = 0
+        self._hits = 0
+        self._misses = 0
+
+    def get(self, view_id, change_count, key):
+        """
+        Gets a cached result
+
+        :param view_id: The id of the view
+        :param change_count: The current change count of the view
+        :param key: The key of the arguments
+        :returns: A tuple of whether it was found, and the result
+        """
+
+        with self._lock:
+            entry = self._views.get(view_id)
+            if entry is not None and entry[0] == change_count and key in entry[1]:
+                self._views.move_to_end(view_id)
+                entry[1].move_to_end(key)
+                self._hits += 1
+                return True, entry[1][key]
+
+            self._misses += 1
+            return False, None
+
+    def put(self, view_id, change_count, key, result):
+        """
+        Caches a result, discarding the results of other change counts of the view and evicting
+        the least recently used results if exceeding the limits
+
+        :param view_id: The id of the view
+        :param change_count: The change count of the view the result was computed for
+        :param key: The key of the arguments
+        :param result: The result
+        """
+
+        with self._lock:
+            entry = self._views.get(view_id)
+            if entry is None or entry[0] != change_count:
+                if entry is not None:
+                    self._size -= len(entry[1])
+                entry = (change_count, OrderedDict())
+                self._views[view_id] = entry
+            self._views.move_to_end(view_id)
+
+            results = entry[1]
+            if key not in results:
+                self._size += 1
+            results[key] = result
+            results.move_to_end(key)
+
+            if len(results) > self._maxsize:
+                results.popitem(last = False)
+                self._size -= 1
+
+            while self._size > self._max_total:
+                lru_view_id, (_, lru_results) = next(iter(self._views.items()))
+                lru_results.popitem(last = False)
+                self._size -= 1
+                if not lru_results:
+                    del self._views[lru_view_id]
+
+    def purge(self, view_id):
+        """
+        Discards all results of a view
+
+        :param view_id: The id of the view
+        """
+
+        with self._lock:
+            entry = self._views.pop(view_id, None)
+            if entry is not None:
+                self._size -= len(entry[1])
+
+    def clear(self):
+        """
+        Discards all results
+        """
+
+        with self._lock:
+            self._views.clear()
+            self._size = 0
+
+    def info(self):
+        """
+        Gets the statistics of the cache
+
+        :returns: A dictionary of the number of hits, misses and cached results
+        """
+
+        with self._lock:
+            return {'hits' : self._hits, 'misses' : self._misses, 'size' : self._size}
+
+def cached_per_view(maxsize : int = 128, max_total : int = 4096) -> Callable:
+    """
+    Decorator caching the results of a function taking a view as first argument, until the view
+    is modified. Only use it for functions depending on the contents of the view and the arguments
+    (which must be hashable), not on e.g. the selection or viewport.
+
+    The decorated function gets cache_info() returning the statistics of the cache, and
+    cache_clear() discarding all results. ViewCacheListener discards the results of closed views.
+
+    :param maxsize: Max number of results per view
+    :param max_total: Max number of results for all views
+    """
+
+    def decorator(func):
+        cache = _ViewCache(maxsize, max_total)
+        _caches.append(cache)
+
+        @functools.wraps(func)
+        def wrapper(view, *args, **kwargs):
+            view_id = view.id()
+            change_count = view.change_count()
+            key = args + _KWARGS_MARK + tuple(sorted(kwargs.items())) if kwargs else args
+
+            found, result = cache.get(view_id, change_count, key)
+            if found:
+                return result
+
+            result = func(view, *args, **kwargs)
+            cache.put(view_id, change_count, key, result)
+            return result
+
+        wrapper.cache_info = cache.info
+        wrapper.cache_clear = cache.clear
+        return wrapper
+
+    return decorator
+
+class ViewCacheListener(sublime_plugin.EventListener):
+    """
+    Discards the cached results of closed views. Import it into a plugin module for Sublime to
+    load it.
+    """
+
+    def on_close(self, view):
+        view_id = view.id()
+        for cache in _caches:
+            cache.purge(view_id)
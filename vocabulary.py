@@ -0,0 +1,551 @@
+"""
+Module handling a vocabulary of the words in the views of a window, e.g. for completions
+"""
+
+import logging
+
+# Local logger
+_logger = logging.getLogger(__name__)
+
+import sublime
+import sublime_plugin
+import heapq
+import re
+
+from collections import Counter, OrderedDict
+from typing import List, Tuple
+
+from . import view as view_util
+from .scheduler import Scheduler
+
+# Number of lines per block of a view. Words are counted per block, so that a modification only
+# requires the blocks it touched to be counted again.
+_BLOCK_LINES = 256
+
+# Min length of words to include
+_MIN_WORD_LENGTH = 3
+
+# Time in ms to wait for further modifications before counting modified blocks again
+_RECOUNT_DELAY = 100
+
+# Max number of prefixes whose most frequent words are cached
+_QUERY_CACHE_SIZE = 1024
+
+_word_pattern = re.compile(view_util.WORD_REGEX)
+
+# Vocabularies per window id
+_vocabularies = {}
+
+# Scheduler debouncing the recounting of modified views
+_scheduler = Scheduler()
+
+class _PrefixTrie():
+    """
+    An internal-only prefix tree of words and their number of occurrences. Nodes are dictionaries
+    of characters to child nodes, with the count of the word ending at the node under key None.
+
+    The results of queries are cached per prefix until a word starting with it changes, as short
+    prefixes require walking a large part of the tree.
+    """
+
+    def __init__(self):
+        self._root = {}
+        self._size = 0
+        # Prefix -> (limit, results) of previous queries
+        self._query_cache = {}
+
+    def __len__(self):
+        return self._size
+
+    def add(self, word, count):
+        """
+        Adds occurrences of a word
+
+        :param word: The word
+        :param count: The number of occurrences
+        """
+
+        self._invalidate(word)
+        node = self._root
+        for char in word:
+            node = node.setdefault(char, {})
+        if None not in node:
+            self._size += 1
+        node[None] = node.get(None, 0) + count
+
+    def remove(self, word, count):
+        """
+        Removes occurrences of a word, and the word once none remain
+
+        :param word: The word
+        :param count: The number of occurrences
+        """
+
+        self._invalidate(word)
+        path = []
+        node = self._root
+        for char in word:
+            child = node.get(char)
+            if child is None:
+                return
+            path.append((node, char))
+            node = child
+
+        remaining = node.get(None, 0) - count
+        if remaining > 0:
+            node[None] = remaining
+            return
+
+        if None in node:
+            del node[None]
+            self._size -= 1
+
+        # Prune nodes no longer leading to any word
+        for parent, char in reversed(path):
+            if parent[char]:
+                break
+            del parent[char]
+
+    def query(self, prefix, limit):
+        """
+        Gets the most frequent words starting with a prefix
+
+        :param prefix: The prefix
+        :param limit: Max number of words
+        :returns: A list of (word, count) tuples, most frequent first
+        """
+
+        cached = self._query_cache.get(prefix)
+        if cached is not None and (cached[0] >= limit or len(cached[1]) < cached[0]):
+            return cached[1][:limit]
+
+        node = self._root
+        for char in prefix:
+            node = node.get(char)
+            if node is None:
+                return []
+
+        def _walk():
+            stack = [(prefix, node)]
+            while stack:
+                word, current = stack.pop()
+                for char, child in current.items():
+                    if char is None:
+                        yield (child, word)
+                    else:
+                        stack.append((word + char, child))
+
+        results = [(word, count) for count, word in heapq.nlargest(limit, _walk())]
+        if len(self._query_cache) >= _QUERY_CACHE_SIZE:
+            self._query_cache.clear()
+        self._query_cache[prefix] = (limit, results)
+        return results
+
+    def _invalidate(self, word):
+        """
+        Drops the cached results of the prefixes of a word
+
+        :param word: The word
+        """
+
+        if not self._query_cache:
+            return
+        for i in range(len(word) + 1):
+            self._query_cache.pop(word[:i], None)
+
+class _BufferWords():
+    """
+    An internal-only class counting the words of a buffer in blocks of lines
+    """
+
+    def __init__(self, view, blocks):
+        """
+        Initializes the counts
+
+        :param view: The applicable view
+        :param blocks: The blocks of the whole contents of the buffer, see count_text
+        """
+
+        self.view = view
+        # List of [number of lines, Counter of words, whether to be counted again]. The Counter of a
+        # block to be counted again holds the words of the blocks it was merged from, which remain
+        # counted until then.
+        self._blocks = blocks
+
+    @staticmethod
+    def count_text(text):
+        """
+        Counts the words of the contents of a buffer, e.g. on a background thread
+
+        :param text: The contents
+        :returns: The list of blocks
+        """
+
+        return _BufferWords._count_lines(text.split("\n"))
+
+    @property
+    def counts(self):
+        """
+        Property reflecting the words counted of the buffer
+
+        :returns: The Counter of words
+        """
+
+        total = Counter()
+        for _, counts, _ in self._blocks:
+            total.update(counts)
+        return total
+
+    def apply_changes(self, changes):
+        """
+        Updates the blocks for modifications. The modified blocks are merged and marked to be
+        counted again. Their words remain counted until then, so that completions near the
+        modifications keep working while typing.
+
+        :param changes: The list of sublime.TextChange, in order
+        """
+
+        for change in changes:
+            first_row = change.a.row
+            last_row = change.b.row
+
+            # Find the blocks [i, j] covering the replaced rows
+            start = 0
+            i = 0
+            while i < len(self._blocks) - 1 and start + self._blocks[i][0] <= first_row:
+                start += self._blocks[i][0]
+                i += 1
+            j = i
+            end = start + self._blocks[i][0]
+            while j < len(self._blocks) - 1 and last_row >= end:
+                j += 1
+                end += self._blocks[j][0]
+
+            if i == j:
+                counts = self._blocks[i][1]
+            else:
+                counts = Counter()
+                for _, block_counts, _ in self._blocks[i:j + 1]:
+                    counts.update(block_counts)
+
+            lines = end - start - (last_row - first_row) + change.str.count("\n")
+            self._blocks[i:j + 1] = [[lines, counts, True]]
+
+    def recount(self):
+        """
+        Counts the blocks marked to be counted again, splitting blocks which grew too large
+
+        :returns: A tuple of the Counters of words counted and no longer counted
+        """
+
+        added = Counter()
+        removed = Counter()
+        blocks = []
+        row = 0
+        for block in self._blocks:
+            lines, _, dirty = block
+            if dirty:
+                begin = self.view.text_point(row, 0)
+                end = self.view.text_point(row + lines, 0) if row + lines <= self._last_row() \
+                    else self.view.size()
+                text = self.view.substr(sublime.Region(begin, end))
+                text_lines = text.split("\n")
+                if text_lines and text_lines[-1] == "" and len(text_lines) > lines:
+                    # The region ends with the newline of its last line
+                    text_lines.pop()
+                new_blocks = self._count_lines(text_lines)
+                removed.update(block[1])
+                for new_block in new_blocks:
+                    added.update(new_block[1])
+                blocks.extend(new_blocks)
+            else:
+                blocks.append(block)
+            row += lines
+
+        self._blocks = blocks
+
+        # Only update the words whose counts changed
+        difference = added.copy()
+        difference.subtract(removed)
+        return (Counter({w : c for w, c in difference.items() if c > 0}),
+            Counter({w : -c for w, c in difference.items() if c < 0}))
+
+    def _last_row(self):
+        """
+        Gets the index of the last row of the view
+        """
+
+        return self.view.rowcol(self.view.size())[0]
+
+    @staticmethod
+    def _count_lines(lines):
+        """
+        Counts the words of lines, grouped in blocks
+
+        :param lines: The list of lines
+        :returns: The list of blocks
+        """
+
+        blocks = []
+        for i in range(0, max(len(lines), 1), _BLOCK_LINES):
+            block_lines = lines[i:i + _BLOCK_LINES]
+            counts = Counter(word for word in _word_pattern.findall("\n".join(block_lines))
+                if len(word) >= _MIN_WORD_LENGTH)
+            blocks.append([max(len(block_lines), 1), counts, False])
+        return blocks
+
+class Vocabulary():
+    """
+    The words of the views of a window and their number of occurrences, kept in a prefix tree and
+    updated incrementally on modifications
+    """
+
+    def __init__(self, max_views : int = 50, max_words : int = 200000):
+        """
+        Initializes the vocabulary
+
+        :param max_views: Max number of buffers to include. The least recently used are evicted.
+        :param max_words: Max number of distinct words. Least recently used buffers are evicted
+                          until below.
+        """
+
+        self._max_views = max_views
+        self._max_words = max_words
+        self._trie = _PrefixTrie()
+        # Buffer id -> _BufferWords, least recently used first
+        self._buffers = OrderedDict()
+        # Buffer id -> the job counting its words
+        self._pending = {}
+
+    def __len__(self) -> int:
+        return len(self._trie)
+
+    @property
+    def max_views(self) -> int:
+        """
+        Property reflecting the max number of buffers to include
+        """
+
+        return self._max_views
+
+    def __contains__(self, buffer_id : int) -> bool:
+        return buffer_id in self._buffers or buffer_id in self._pending
+
+    def add_view(self, view : sublime.View) -> None:
+        """
+        Includes the words of a view, or marks it as recently used if already included. The words
+        are counted in the background from a snapshot of the contents, and included once done.
+
+        :param view: The applicable view
+        """
+
+        from . import jobs
+
+        buffer_id = view.buffer_id()
+        if buffer_id in self._buffers:
+            self._buffers.move_to_end(buffer_id)
+            return
+        if buffer_id in self._pending:
+            return
+
+        change_count = view.change_count()
+        text = view.substr(sublime.Region(0, view.size()))
+
+        def _on_done(blocks):
+            if self._pending.pop(buffer_id, None) is None or not view.is_valid():
+                return
+            if view.change_count() != change_count:
+                # Modified while counting, so the blocks are outdated
+                self.add_view(view)
+                return
+            words = _BufferWords(view, blocks)
+            self._buffers[buffer_id] = words
+            self._update(words.counts, Counter())
+            self._evict()
+
+        self._pending[buffer_id] = jobs.get_queue().submit(
+            lambda token : _BufferWords.count_text(text),
+            name = f"count words of buffer {buffer_id}",
+            priority = jobs.PRIORITY_LOW,
+            on_done = _on_done)
+
+    def remove_view(self, buffer_id : int) -> None:
+        """
+        Excludes the words of a buffer
+
+        :param buffer_id: The id of the buffer
+        """
+
+        job = self._pending.pop(buffer_id, None)
+        if job is not None:
+            job.cancel()
+
+        words = self._buffers.pop(buffer_id, None)
+        if words is not None:
+            _scheduler.cancel((id(self), buffer_id))
+            self._update(Counter(), words.counts)
+
+    def clear(self) -> None:
+        """
+        Excludes the words of all buffers
+        """
+
+        for buffer_id in list(self._buffers) + list(self._pending):
+            self.remove_view(buffer_id)
+
+    def apply_changes(self, buffer_id : int, changes : List[sublime.TextChange]) -> None:
+        """
+        Updates the words of a buffer for modifications
+
+        :param buffer_id: The id of the buffer
+        :param changes: The list of sublime.TextChange, in order
+        """
+
+        words = self._buffers.get(buffer_id)
+        if words is None:
+            return
+
+        words.apply_changes(changes)
+        _scheduler.debounce((id(self), buffer_id), _RECOUNT_DELAY, self._recount, buffer_id)
+
+    def query(self, prefix : str, limit : int = 100) -> List[Tuple[str, int]]:
+        """
+        Gets the most frequent words starting with a prefix
+
+        :param prefix: The prefix
+        :param limit: Max number of words
+        :returns: A list of (word, count) tuples, most frequent first
+        """
+
+        return self._trie.query(prefix, limit)
+
+    def _recount(self, buffer_id : int) -> None:
+        """
+        Counts the modified blocks of a buffer again
+
+        :param buffer_id: The id of the buffer
+        """
+
+        words = self._buffers.get(buffer_id)
+        if words is None or not words.view.is_valid():
+            return
+        self._update(*words.recount())
+        self._evict()
+
+    def _update(self, added : Counter, removed : Counter) -> None:
+        """
+        Updates the prefix tree
+
+        :param added: The occurrences of words to add
+        :param removed: The occurrences of words to remove
+        """
+
+        for word, count in removed.items():
+            self._trie.remove(word, count)
+        for word, count in added.items():
+            self._trie.add(word, count)
+
+    def _evict(self) -> None:
+        """
+        Evicts the least recently used buffers while exceeding the limits, keeping at least one
+        """
+
+        while len(self._buffers) > 1 and \
+                (len(self._buffers) > self._max_views or len(self._trie) > self._max_words):
+            buffer_id = next(iter(self._buffers))
+            _logger.debug(f"Evicting buffer {buffer_id} from vocabulary.")
+            self.remove_view(buffer_id)
+
+def get_vocabulary(window : sublime.Window) -> Vocabulary:
+    """
+    Gets the vocabulary of a window, creating it on first request from the views of the window
+    (the active one last, as most recently used)
+
+    :param window: The applicable window
+    """
+
+    vocabulary = _vocabularies.get(window.id())
+    if vocabulary is None:
+        vocabulary = Vocabulary()
+        _vocabularies[window.id()] = vocabulary
+
+        active_view = window.active_view()
+        views = [view for view in window.views()
+            if active_view is None or view.id() != active_view.id()]
+        if active_view is not None:
+            views.append(active_view)
+        for view in views[-vocabulary.max_views:]:
+            vocabulary.add_view(view)
+    return vocabulary
+
+def query_completions(view : sublime.View, prefix : str, limit : int = 100) -> List[str]:
+    """
+    Gets the words of the window of a view starting with a prefix, for on_query_completions
+
+    :param view: The applicable view
+    :param prefix: The prefix
+    :param limit: Max number of words
+    :returns: The list of words, most frequent first, excluding the prefix itself
+    """
+
+    window = view.window()
+    if window is None or not prefix:
+        return []
+    return [word for word, _ in get_vocabulary(window).query(prefix, limit + 1) if word != prefix][:limit]
+
+class VocabularyListener(sublime_plugin.EventListener):
+    """
+    Includes views in the vocabulary of their window when activated and excludes them when closed.
+    Import it into a plugin module for Sublime to load it.
+    """
+
+    def on_activated(self, view):
+        window = view.window()
+        if window is not None:
+            get_vocabulary(window).add_view(view)
+
+    def on_close(self, view):
+        if len(view.clones()) > 0:
+            return
+        buffer_id = view.buffer_id()
+        for vocabulary in _vocabularies.values():
+            vocabulary.remove_view(buffer_id)
+
+    def on_pre_close_window(self, window):
+        vocabulary = _vocabularies.pop(window.id(), None)
+        if vocabulary is not None:
+            vocabulary.clear()
+
+class VocabularyTextChangeListener(sublime_plugin.TextChangeListener):
+    """
+    Updates the vocabularies on modifications. Import it into a plugin module for Sublime to load
+    it.
+    """
+
+    @classmethod
+    def is_applicable(cls, buffer):
+        return True
+
+    def on_text_changed(self, changes):
+        buffer_id = self.buffer.id()
+        for vocabulary in _vocabularies.values():
+            vocabulary.apply_changes(buffer_id, changes)
+
+    def on_revert(self):
+        self._recount_buffer()
+
+    def on_reload(self):
+        self._recount_buffer()
+
+    def _recount_buffer(self):
+        """
+        Counts the words of the buffer again, as the modifications of reverts and reloads are not
+        reported
+        """
+
+        buffer_id = self.buffer.id()
+        view = self.buffer.primary_view()
+        for vocabulary in _vocabularies.values():
+            if buffer_id in vocabulary:
+                vocabulary.remove_view(buffer_id)
+                vocabulary.add_view(view)